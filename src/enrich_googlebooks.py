@@ -1,11 +1,12 @@
 # enrich_googlebooks.py
 from dotenv import load_dotenv
-import requests
-import json
-import time
-import random
+import httpx
+import asyncio
+import diskcache
+import orjson
 import csv
 import os
+import re
 from datetime import datetime
 
 load_dotenv()
@@ -13,50 +14,181 @@ GOOGLE_BOOKS_API_KEY = os.getenv("GOOGLE_BOOKS_API_KEY")
 if not GOOGLE_BOOKS_API_KEY:
     print("⚠ AVISO: No se encontró GOOGLE_BOOKS_API_KEY en .env. Se utilizará la API sin clave (límites más estrictos de peticiones).")
 BASE_URL = "https://www.googleapis.com/books/v1/volumes"
+OUTPUT_FILE = 'landing/googlebooks_books.csv'
+# Sidecar con los row_number ya escritos: permite reanudar un run interrumpido
+PROGRESS_FILE = 'landing/.gb_progress'
 
-def search_by_isbn(isbn, api_key=None):
+# Orden fijo de columnas del CSV (csv.writer escribe listas, no dicts)
+FIELDNAMES = [
+    'row_number', 'gb_id', 'title', 'subtitle', 'authors', 'publisher',
+    'published_date', 'language', 'page_count', 'categories',
+    'isbn10', 'isbn13', 'price_amount', 'price_currency', 'thumbnail',
+    'search_method', 'goodreads_title', 'goodreads_author'
+]
+
+# Compilado una vez: corta el título en el primer ':' o '(' (subtítulos/series)
+_TITLE_STRIP = re.compile(r'[:\(]')
+
+# Peticiones HTTP en vuelo a la vez (semáforo: respeta el QPS de Google Books)
+MAX_CONCURRENT = 10 if GOOGLE_BOOKS_API_KEY else 2
+_sem = None  # Se crea dentro del event loop en enrich_from_goodreads
+
+# Caché persistente de respuestas: reejecutar el script no vuelve a
+# consultar la API para ISBNs/queries ya vistos
+CACHE = diskcache.Cache('landing/.gb_cache')
+CACHE_TTL = 30 * 86400        # Respuestas válidas: 30 días
+CACHE_TTL_ERROR = 86400       # Errores de red: 1 día (evita tormentas de reintentos)
+
+# Peticiones en vuelo en esta ejecución: si dos libros comparten ISBN o
+# query, el segundo espera al future del primero en vez de repetir la llamada
+_inflight = {}
+
+async def _fetch_json_cached(client, cache_key, params):
+    """Consulta caché en disco → peticiones en vuelo → red (en ese orden)"""
+    if cache_key in CACHE:
+        return CACHE[cache_key]
+
+    # Coalescencia: si esta misma query ya está en vuelo, esperar su resultado
+    fut = _inflight.get(cache_key)
+    if fut is not None:
+        return await fut
+
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+    _inflight[cache_key] = fut
+    try:
+        data = await _fetch_json(client, params)
+        if data is not None:
+            CACHE.set(cache_key, data, expire=CACHE_TTL)
+        else:
+            # También cacheamos el fallo (TTL corto) para no reintentar en bucle
+            CACHE.set(cache_key, None, expire=CACHE_TTL_ERROR)
+        fut.set_result(data)
+        return data
+    except Exception as e:
+        fut.set_exception(e)
+        raise
+    finally:
+        _inflight.pop(cache_key, None)
+
+async def _fetch_json(client, params):
+    """GET a la API acotado por el semáforo, con backoff exponencial ante 429"""
+    backoff = 1.0
+    for intento in range(4):
+        async with _sem:
+            response = await client.get(BASE_URL, params=params)
+            if response.status_code == 200:
+                # orjson decodifica en C, más rápido que response.json()
+                return orjson.loads(response.content)
+            if response.status_code != 429:
+                return None
+            # 429: la API pide frenar; respetar Retry-After si viene
+            retry_after = response.headers.get('Retry-After')
+        espera = float(retry_after) if retry_after else backoff
+        print(f"      ⚠ Rate limit (429), reintentando en {espera:.1f}s...")
+        await asyncio.sleep(espera)
+        backoff *= 2
+    return None
+
+# ISBNs por petición en las consultas por lotes con OR
+ISBN_BATCH_SIZE = 10
+
+async def _prefetch_lote(client, lote):
+    """Consulta un lote de ISBNs en una sola petición con OR y cachea cada uno"""
+    params = {
+        'q': ' OR '.join(f'isbn:{x}' for x in lote),
+        'maxResults': 40
+    }
+    if GOOGLE_BOOKS_API_KEY:
+        params['key'] = GOOGLE_BOOKS_API_KEY
+
+    try:
+        data = await _fetch_json(client, params)
+    except Exception as e:
+        print(f"      ⚠ Error en lote de ISBNs: {e}")
+        return
+
+    if not data:
+        return
+
+    # Mapear cada item devuelto a los ISBNs que originaron la consulta y
+    # guardarlo en la caché con el mismo formato que la búsqueda individual
+    pedidos = set(lote)
+    for item in data.get('items', []):
+        for ident in item.get('volumeInfo', {}).get('industryIdentifiers', []):
+            isbn = ident.get('identifier')
+            if isbn in pedidos:
+                CACHE.set(
+                    f"isbn:{isbn}",
+                    {'totalItems': 1, 'items': [item]},
+                    expire=CACHE_TTL
+                )
+
+async def prefetch_isbns(client, books):
+    """Precarga la caché consultando los ISBNs pendientes en lotes con OR.
+
+    Amortiza la latencia HTTP entre ~10 libros por petición; los ISBNs que
+    el lote no devuelva caen después al camino individual de search_by_isbn.
+    """
+    isbns = []
+    vistos = set()
+    for book in books:
+        for campo in ('isbn13', 'isbn10'):
+            isbn = book.get(campo)
+            if isbn and isbn not in vistos and f"isbn:{isbn}" not in CACHE:
+                vistos.add(isbn)
+                isbns.append(isbn)
+
+    if not isbns:
+        return
+
+    lotes = [
+        isbns[i:i + ISBN_BATCH_SIZE]
+        for i in range(0, len(isbns), ISBN_BATCH_SIZE)
+    ]
+    print(f"📦 Precargando {len(isbns)} ISBNs en {len(lotes)} lotes (OR)...")
+    await asyncio.gather(*[_prefetch_lote(client, lote) for lote in lotes])
+
+async def search_by_isbn(client, isbn, api_key=None):
     """Busca un libro por ISBN en Google Books"""
     params = {'q': f'isbn:{isbn}'}
     if api_key:
         params['key'] = api_key
-    
+
     try:
-        response = requests.get(BASE_URL, params=params, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('totalItems', 0) > 0:
-                return data['items'][0]  # Retorna el primer resultado
+        data = await _fetch_json_cached(client, f"isbn:{isbn}", params)
+        if data and data.get('totalItems', 0) > 0:
+            return data['items'][0]  # Retorna el primer resultado
         return None
     except Exception as e:
         print(f"      ⚠ Error buscando ISBN: {e}")
         return None
 
-def search_by_title_author(title, author, api_key=None):
+async def search_by_title_author(client, title, author, api_key=None):
     """Busca un libro por título y autor en Google Books"""
     # Limpiar el título y autor para la búsqueda
-    title_clean = title.split(':')[0].split('(')[0].strip()  # Quitar subtítulos y series
+    title_clean = _TITLE_STRIP.split(title, 1)[0].strip()  # Quitar subtítulos y series
     author_clean = author.split(',')[0].strip() if author else ""  # Solo primer autor
-    
+
     # Construir query
     query_parts = []
     if title_clean:
         query_parts.append(f'intitle:{title_clean}')
     if author_clean:
         query_parts.append(f'inauthor:{author_clean}')
-    
+
     query = '+'.join(query_parts)
-    
+
     params = {'q': query, 'maxResults': 5}  # Máximo 5 resultados para elegir el mejor
     if api_key:
         params['key'] = api_key
-    
+
     try:
-        response = requests.get(BASE_URL, params=params, timeout=10)
-        if response.status_code == 200:
-            data = response.json()
-            if data.get('totalItems', 0) > 0:
-                # Retornar el resultado más completo (con más campos)
-                return select_best_match(data['items'], title_clean, author_clean)
+        cache_key = f"ta:{title_clean}|{author_clean}"
+        data = await _fetch_json_cached(client, cache_key, params)
+        if data and data.get('totalItems', 0) > 0:
+            # Retornar el resultado más completo (con más campos)
+            return select_best_match(data['items'], title_clean, author_clean)
         return None
     except Exception as e:
         print(f"      ⚠ Error buscando título+autor: {e}")
@@ -67,11 +199,11 @@ def select_best_match(items, title, author):
     # Criterio: preferir resultados con más información completa
     best = None
     best_score = 0
-    
+
     for item in items:
         volume_info = item.get('volumeInfo', {})
         sale_info = item.get('saleInfo', {})
-        
+
         # Calcular score basado en completitud de campos
         score = 0
         if volume_info.get('title'):
@@ -88,21 +220,21 @@ def select_best_match(items, title, author):
             score += 1
         if sale_info.get('listPrice'):
             score += 1
-        
+
         if score > best_score:
             best_score = score
             best = item
-    
+
     return best
 
 def extract_book_data(book_item, row_number):
     """Extrae los campos relevantes de un resultado de Google Books"""
     if not book_item:
         return None
-    
+
     volume_info = book_item.get('volumeInfo', {})
     sale_info = book_item.get('saleInfo', {})
-    
+
     # Extraer ISBNs
     isbn10, isbn13 = None, None
     for identifier in volume_info.get('industryIdentifiers', []):
@@ -110,22 +242,22 @@ def extract_book_data(book_item, row_number):
             isbn10 = identifier['identifier']
         elif identifier['type'] == 'ISBN_13':
             isbn13 = identifier['identifier']
-    
+
     # Extraer precio
     price_amount = None
     price_currency = None
     if sale_info.get('listPrice'):
         price_amount = sale_info['listPrice'].get('amount')
         price_currency = sale_info['listPrice'].get('currencyCode')
-    
+
     # Extraer autores (lista separada por pipe |)
     authors = volume_info.get('authors', [])
     authors_str = '|'.join(authors) if authors else None
-    
+
     # Extraer categorías (lista separada por pipe |)
     categories = volume_info.get('categories', [])
     categories_str = '|'.join(categories) if categories else None
-    
+
     return {
         'row_number': row_number,
         'gb_id': book_item.get('id'),
@@ -144,134 +276,149 @@ def extract_book_data(book_item, row_number):
         'thumbnail': volume_info.get('imageLinks', {}).get('thumbnail')
     }
 
-def enrich_from_goodreads():
-    """Lee el JSON de Goodreads y enriquece con Google Books"""
+def registro_vacio(book):
+    """Registro vacío para mantener trazabilidad cuando no hay match"""
+    return {
+        'row_number': book['row_number'],
+        'gb_id': None,
+        'title': None,
+        'subtitle': None,
+        'authors': None,
+        'publisher': None,
+        'published_date': None,
+        'language': None,
+        'page_count': None,
+        'categories': None,
+        'isbn10': None,
+        'isbn13': None,
+        'price_amount': None,
+        'price_currency': None,
+        'thumbnail': None,
+        'search_method': 'not_found',
+        'goodreads_title': book['title'],
+        'goodreads_author': book.get('author')
+    }
+
+async def process_book(client, book):
+    """Procesa un libro: cadena de búsqueda ISBN13 → ISBN10 → título+autor"""
+    # Estrategia de búsqueda:
+    # 1. Intentar por ISBN13 (si existe)
+    # 2. Intentar por ISBN10 (si existe)
+    # 3. Fallback: título + autor
+
+    result = None
+    search_method = None
+
+    if book.get('isbn13'):
+        result = await search_by_isbn(client, book['isbn13'], GOOGLE_BOOKS_API_KEY)
+        search_method = 'isbn13'
+
+    if not result and book.get('isbn10'):
+        result = await search_by_isbn(client, book['isbn10'], GOOGLE_BOOKS_API_KEY)
+        search_method = 'isbn10'
+
+    if not result:
+        result = await search_by_title_author(
+            client, book['title'], book.get('author'), GOOGLE_BOOKS_API_KEY
+        )
+        search_method = 'title_author'
+
+    if result:
+        enriched_data = extract_book_data(result, book['row_number'])
+        if enriched_data:
+            enriched_data['search_method'] = search_method
+            enriched_data['goodreads_title'] = book['title']
+            enriched_data['goodreads_author'] = book.get('author')
+            print(f"  ✓ {book['title'][:50]}... (ISBN13: {enriched_data['isbn13'] or 'N/A'})")
+            return enriched_data
+
+    print(f"  ✗ No encontrado: {book['title'][:50]}...")
+    # Guardar registro vacío para mantener trazabilidad
+    return registro_vacio(book)
+
+async def enrich_from_goodreads():
+    """Lee el JSON de Goodreads y enriquece con Google Books (asíncrono)"""
     print("=" * 60)
     print("  ENRIQUECIMIENTO GOOGLE BOOKS - Proyecto RA1")
     print("=" * 60)
-    
+
     # Leer JSON de Goodreads
     goodreads_file = 'landing/goodreads_books.json'
     if not os.path.exists(goodreads_file):
         raise FileNotFoundError(f"❌ No se encuentra {goodreads_file}. Ejecuta scrape_goodreads.py primero.")
-    
-    with open(goodreads_file, 'r', encoding='utf-8') as f:
-        goodreads_data = json.load(f)
-    
+
+    with open(goodreads_file, 'rb') as f:
+        goodreads_data = orjson.loads(f.read())
+
     books = goodreads_data['books']
-    print(f"📚 Procesando {len(books)} libros de Goodreads\n")
-    
+    print(f"📚 Procesando {len(books)} libros de Goodreads (máx. {MAX_CONCURRENT} peticiones en vuelo)\n")
+
+    # El semáforo acota las peticiones en vuelo sin serializar el event loop
+    global _sem
+    _sem = asyncio.Semaphore(MAX_CONCURRENT)
+    _inflight.clear()
+
+    # Reanudación: saltar los libros ya escritos en un run interrumpido
+    procesados = set()
+    if os.path.exists(PROGRESS_FILE):
+        with open(PROGRESS_FILE, 'r', encoding='utf-8') as pf:
+            procesados = {int(linea) for linea in pf if linea.strip()}
+
+    pendientes = [b for b in books if b['row_number'] not in procesados]
+    if procesados:
+        print(f"♻️  Reanudando: {len(procesados)} libros ya procesados, quedan {len(pendientes)}")
+
+    modo_csv = 'a' if procesados else 'w'
     enriched_books = []
+
+    # Una sola sesión HTTP para todo el enriquecimiento; todos los libros
+    # se lanzan a la vez y el semáforo limita la concurrencia real.
+    # El CSV se escribe en streaming según va completándose cada libro
+    # (asyncio.as_completed), con flush para que un corte no pierda filas.
+    # HTTP/2: muchas peticiones multiplexadas sobre una sola conexión TLS
+    limits = httpx.Limits(max_keepalive_connections=20, max_connections=20)
+    async with httpx.AsyncClient(http2=True, timeout=10, limits=limits) as client:
+        # Primero los lotes OR: ~10 ISBNs por petición en vez de uno a uno
+        await prefetch_isbns(client, pendientes)
+
+        tasks = [
+            asyncio.create_task(process_book(client, book))
+            for book in pendientes
+        ]
+
+        with open(OUTPUT_FILE, modo_csv, newline='', encoding='utf-8') as f, \
+             open(PROGRESS_FILE, 'a', encoding='utf-8') as pf:
+            writer = csv.writer(f)
+            if modo_csv == 'w':
+                writer.writerow(FIELDNAMES)
+            for fut in asyncio.as_completed(tasks):
+                row = await fut
+                writer.writerow([row.get(k) for k in FIELDNAMES])
+                f.flush()
+                pf.write(f"{row['row_number']}\n")
+                pf.flush()
+                enriched_books.append(row)
+
+    # Ejecución completa: el próximo run parte de cero
+    if os.path.exists(PROGRESS_FILE):
+        os.remove(PROGRESS_FILE)
+
+    # Estadísticas a partir de los registros enriquecidos en este run
     stats = {
-        'total': len(books),
-        'found': 0,
-        'not_found': 0,
-        'with_isbn': 0,
-        'with_price': 0
+        'total': len(pendientes),
+        'found': sum(1 for b in enriched_books if b['search_method'] != 'not_found'),
+        'not_found': sum(1 for b in enriched_books if b['search_method'] == 'not_found'),
+        'with_isbn': sum(1 for b in enriched_books if b['isbn13']),
+        'with_price': sum(1 for b in enriched_books if b['price_amount'])
     }
-    
-    for idx, book in enumerate(books, 1):
-        print(f"[{idx}/{len(books)}] {book['title'][:50]}...")
-        
-        # Estrategia de búsqueda:
-        # 1. Intentar por ISBN13 (si existe)
-        # 2. Intentar por ISBN10 (si existe)
-        # 3. Fallback: título + autor
-        
-        result = None
-        search_method = None
-        
-        if book.get('isbn13'):
-            print(f"  → Buscando por ISBN13: {book['isbn13']}")
-            result = search_by_isbn(book['isbn13'], GOOGLE_BOOKS_API_KEY)
-            search_method = 'isbn13'
-        
-        if not result and book.get('isbn10'):
-            print(f"  → Buscando por ISBN10: {book['isbn10']}")
-            result = search_by_isbn(book['isbn10'], GOOGLE_BOOKS_API_KEY)
-            search_method = 'isbn10'
-        
-        if not result:
-            print(f"  → Buscando por título + autor")
-            result = search_by_title_author(book['title'], book.get('author'), GOOGLE_BOOKS_API_KEY)
-            search_method = 'title_author'
-        
-        if result:
-            enriched_data = extract_book_data(result, book['row_number'])
-            if enriched_data:
-                enriched_data['search_method'] = search_method
-                enriched_data['goodreads_title'] = book['title']
-                enriched_data['goodreads_author'] = book.get('author')
-                enriched_books.append(enriched_data)
-                
-                stats['found'] += 1
-                if enriched_data['isbn13']:
-                    stats['with_isbn'] += 1
-                if enriched_data['price_amount']:
-                    stats['with_price'] += 1
-                
-                print(f"  ✓ Encontrado: {enriched_data['title'][:40]}... (ISBN13: {enriched_data['isbn13'] or 'N/A'})")
-            else:
-                stats['not_found'] += 1
-                print(f"  ✗ No se pudo extraer datos")
-        else:
-            stats['not_found'] += 1
-            print(f"  ✗ No encontrado en Google Books")
-            # Guardar registro vacío para mantener trazabilidad
-            enriched_books.append({
-                'row_number': book['row_number'],
-                'gb_id': None,
-                'title': None,
-                'subtitle': None,
-                'authors': None,
-                'publisher': None,
-                'published_date': None,
-                'language': None,
-                'page_count': None,
-                'categories': None,
-                'isbn10': None,
-                'isbn13': None,
-                'price_amount': None,
-                'price_currency': None,
-                'thumbnail': None,
-                'search_method': 'not_found',
-                'goodreads_title': book['title'],
-                'goodreads_author': book.get('author')
-            })
-        
-        # Pausa para no saturar la API (más corta si tienes API key)
-        if GOOGLE_BOOKS_API_KEY:
-            time.sleep(random.uniform(0.2, 0.5))
-        else:
-            time.sleep(random.uniform(1.0, 1.5))
-    
-    return enriched_books, stats
 
-def save_to_csv(enriched_books):
-    """Guarda los datos enriquecidos en CSV"""
-    output_file = 'landing/googlebooks_books.csv'
-    
-    fieldnames = [
-        'row_number', 'gb_id', 'title', 'subtitle', 'authors', 'publisher',
-        'published_date', 'language', 'page_count', 'categories', 
-        'isbn10', 'isbn13', 'price_amount', 'price_currency', 'thumbnail',
-        'search_method', 'goodreads_title', 'goodreads_author'
-    ]
-    
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(enriched_books)
-    
-    return output_file
+    return enriched_books, stats
 
 def main():
-    # Enriquecer
-    enriched_books, stats = enrich_from_goodreads()
-    
-    # Guardar CSV
-    output_file = save_to_csv(enriched_books)
-    
+    # Enriquecer (asíncrono; el CSV se escribe en streaming durante el proceso)
+    enriched_books, stats = asyncio.run(enrich_from_goodreads())
+    output_file = OUTPUT_FILE
+
     # Estadísticas finales
     print("\n" + "=" * 60)
     print("📊 RESUMEN DEL ENRIQUECIMIENTO")
@@ -284,7 +431,7 @@ def main():
     print(f"\n✅ Guardado en: {output_file}")
     print(f"📦 Tamaño: {os.path.getsize(output_file) / 1024:.2f} KB")
     print("=" * 60)
-    
+
     # Documentar decisiones
     print("\n📝 DECISIONES Y SUPUESTOS:")
     print("  - Búsqueda prioritaria: ISBN13 > ISBN10 > Título+Autor")
@@ -292,8 +439,8 @@ def main():
     print("  - Autores y categorías: separados por pipe '|'")
     print("  - Codificación: UTF-8")
     print("  - Separador CSV: coma ','")
-    print("  - Rate limiting: 0.2-0.5s con API key, 1.0-1.5s sin API key")
+    print(f"  - Concurrencia: máx. {MAX_CONCURRENT} peticiones en vuelo (semáforo + backoff en 429)")
     print("=" * 60)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -6,9 +6,13 @@
 # 0. IMPORTS
 # ============================================================
 import pandas as pd
-import json
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import orjson
 import os
-import hashlib
+from blake3 import blake3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import sys
 from pathlib import Path
@@ -20,7 +24,12 @@ STANDARD_DIR = BASE_DIR / "standard"
 DOCS_DIR = BASE_DIR / "docs"
 
 # Importar nuestros utils
-from utils_isbn import normalize_isbn, isbn10_to_isbn13, validate_isbn13
+from utils_isbn import (
+    normalize_isbn_serie,
+    isbn10_to_isbn13,
+    validate_isbn13,
+    validate_isbn13_serie,
+)
 from utils_quality import (
     check_data_quality,
     validate_date_column,
@@ -34,12 +43,12 @@ from utils_quality import (
 # ============================================================
 
 def leer_goodreads():
-    """Lee el JSON de Goodreads"""
+    """Lee el JSON de Goodreads (orjson: parseo en C)"""
     print("📖 Leyendo landing/goodreads_books.json...")
 
     filepath = LANDING_DIR / "goodreads_books.json"
-    with open(filepath, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with open(filepath, 'rb') as f:
+        data = orjson.loads(f.read())
 
     df = pd.DataFrame(data['books'])
     print(f"   ✓ {len(df)} libros de Goodreads")
@@ -47,11 +56,11 @@ def leer_goodreads():
 
 
 def leer_googlebooks():
-    """Lee el CSV de Google Books"""
+    """Lee el CSV de Google Books (lector multihilo de Arrow)"""
     print("📖 Leyendo landing/googlebooks_books.csv...")
 
     filepath = LANDING_DIR / "googlebooks_books.csv"
-    df = pd.read_csv(filepath, encoding='utf-8')
+    df = pd.read_csv(filepath, engine='pyarrow', dtype_backend='pyarrow')
     print(f"   ✓ {len(df)} registros de Google Books")
     return df
 
@@ -91,30 +100,27 @@ def mapear_googlebooks(df_gb):
     """Mapea columnas de Google Books a esquema estándar"""
     print("🔄 Mapeando columnas de Google Books...")
 
-    # Extraer año de published_date (puede ser YYYY, YYYY-MM, YYYY-MM-DD)
-    def extraer_anio(date_str):
-        if pd.isna(date_str):
-            return None
-        try:
-            return int(str(date_str)[:4])
-        except Exception:
-            return None
+    # Extraer año de published_date (puede ser YYYY, YYYY-MM, YYYY-MM-DD):
+    # primeros 4 caracteres a numérico, NaN propagado vía Int64 nullable
+    anio = pd.to_numeric(
+        df_gb['published_date'].astype('string').str.slice(0, 4),
+        errors='coerce'
+    ).astype('Int64')
 
     # Separar primer autor de la lista (viene como "autor1|autor2|...")
-    def extraer_primer_autor(authors_str):
-        if pd.isna(authors_str):
-            return None
-        return str(authors_str).split('|')[0].strip()
+    primer_autor = (
+        df_gb['authors'].astype('string').str.split('|', n=1).str[0].str.strip()
+    )
 
     df_staging = pd.DataFrame({
         'source_name': 'googlebooks',
         'source_row_number': df_gb['row_number'],
         'titulo': df_gb['title'],
         'subtitulo': df_gb['subtitle'],
-        'autor': df_gb['authors'].apply(extraer_primer_autor),
+        'autor': primer_autor,
         'autores_lista': df_gb['authors'],  # Lista completa
         'editorial': df_gb['publisher'],
-        'anio_publicacion': df_gb['published_date'].apply(extraer_anio),
+        'anio_publicacion': anio,
         'fecha_publicacion': df_gb['published_date'],
         'idioma': df_gb['language'],
         'paginas': df_gb['page_count'],
@@ -135,47 +141,34 @@ def mapear_googlebooks(df_gb):
 # 3. NORMALIZACIÓN
 # ============================================================
 
-def normalizar_titulo(titulo):
-    """Normaliza título para matching: minúsculas, sin tildes, sin signos"""
-    if pd.isna(titulo):
-        return None
+def normalizar_titulo_serie(serie):
+    """Normaliza títulos para matching: minúsculas, sin tildes, sin signos.
 
-    import unicodedata
-
-    # Quitar tildes
-    titulo_str = str(titulo)
-    titulo_nfd = unicodedata.normalize('NFD', titulo_str)
-    titulo_sin_tildes = ''.join(
-        c for c in titulo_nfd if unicodedata.category(c) != 'Mn'
-    )
-
-    # Minúsculas y quitar caracteres especiales (mantener espacios y letras)
-    titulo_norm = titulo_sin_tildes.lower()
-    titulo_norm = ''.join(
-        c if c.isalnum() or c.isspace() else ' ' for c in titulo_norm
+    Vectorizado con los kernels de string de pandas (una pasada en C en
+    lugar de un .apply por fila).
+    """
+    return (
+        serie.astype('string')
+        .str.normalize('NFKD')
+        .str.encode('ascii', errors='ignore')
+        .str.decode('ascii')
+        .str.lower()
+        .str.replace(r'[^a-z0-9\s]', ' ', regex=True)
+        .str.replace(r'\s+', ' ', regex=True)
+        .str.strip()
     )
 
-    # Espacios múltiples → uno solo
-    titulo_norm = ' '.join(titulo_norm.split())
-
-    return titulo_norm
-
 
-def normalizar_autor(autor):
-    """Normaliza autor: minúsculas, sin tildes"""
-    if pd.isna(autor):
-        return None
-
-    import unicodedata
-
-    autor_str = str(autor)
-    autor_nfd = unicodedata.normalize('NFD', autor_str)
-    autor_sin_tildes = ''.join(
-        c for c in autor_nfd if unicodedata.category(c) != 'Mn'
+def normalizar_autor_serie(serie):
+    """Normaliza autores: minúsculas, sin tildes (vectorizado)"""
+    return (
+        serie.astype('string')
+        .str.normalize('NFKD')
+        .str.encode('ascii', errors='ignore')
+        .str.decode('ascii')
+        .str.lower()
+        .str.strip()
     )
-    autor_norm = autor_sin_tildes.lower().strip()
-
-    return autor_norm
 
 
 def normalizar_fecha(fecha):
@@ -200,6 +193,19 @@ def normalizar_fecha(fecha):
     return None
 
 
+def normalizar_fecha_serie(serie):
+    """Versión vectorizada de normalizar_fecha para una columna completa.
+
+    Completa YYYY y YYYY-MM al primer día con máscaras por longitud y deja
+    que pd.to_datetime (camino C de pandas) valide todo de una pasada.
+    """
+    s = serie.astype('string').str.strip()
+    s = s.where(s.str.len() != 4, s + '-01-01')
+    s = s.where(s.str.len() != 7, s + '-01')
+    fechas = pd.to_datetime(s, format='%Y-%m-%d', errors='coerce')
+    return fechas.dt.strftime('%Y-%m-%d')
+
+
 def normalizar_idioma(idioma):
     """Normaliza idioma a BCP-47 minúsculas"""
     if pd.isna(idioma):
@@ -217,19 +223,21 @@ def normalizar_moneda(moneda):
 
 
 def normalizar_df(df):
-    """Aplica todas las normalizaciones a un DataFrame"""
+    """Aplica todas las normalizaciones a un DataFrame (muta el DataFrame
+    recibido: los frames de staging no se reutilizan, así evitamos duplicar
+    la memoria con un .copy() justo antes de añadir columnas)"""
     print("🔧 Normalizando datos...")
 
-    df_norm = df.copy()
+    df_norm = df
 
-    # Títulos y autores normalizados (para matching)
-    df_norm['titulo_normalizado'] = df_norm['titulo'].apply(normalizar_titulo)
-    df_norm['autor_normalizado'] = df_norm['autor'].apply(normalizar_autor)
+    # Títulos y autores normalizados (para matching), vectorizado por columna
+    df_norm['titulo_normalizado'] = normalizar_titulo_serie(df_norm['titulo'])
+    df_norm['autor_normalizado'] = normalizar_autor_serie(df_norm['autor'])
 
-    # Fechas ISO-8601
+    # Fechas ISO-8601 (vectorizado: una sola pasada de pd.to_datetime)
     if 'fecha_publicacion' in df_norm.columns:
-        df_norm['fecha_publicacion'] = df_norm['fecha_publicacion'].apply(
-            normalizar_fecha
+        df_norm['fecha_publicacion'] = normalizar_fecha_serie(
+            df_norm['fecha_publicacion']
         )
 
     # Idioma BCP-47
@@ -240,13 +248,9 @@ def normalizar_df(df):
     if 'moneda' in df_norm.columns:
         df_norm['moneda'] = df_norm['moneda'].apply(normalizar_moneda)
 
-    # ISBNs limpios
-    df_norm['isbn10'] = df_norm['isbn10'].apply(
-        lambda x: normalize_isbn(x)['isbn'] if pd.notna(x) else None
-    )
-    df_norm['isbn13'] = df_norm['isbn13'].apply(
-        lambda x: normalize_isbn(x)['isbn'] if pd.notna(x) else None
-    )
+    # ISBNs limpios (una pasada regex por columna en vez de .apply por celda)
+    df_norm['isbn10'] = normalize_isbn_serie(df_norm['isbn10'], 10)
+    df_norm['isbn13'] = normalize_isbn_serie(df_norm['isbn13'], 13)
 
     return df_norm
 
@@ -254,44 +258,48 @@ def normalizar_df(df):
 # 4. GENERAR book_id CANÓNICO
 # ============================================================
 
-def generar_book_id(row):
+def agregar_book_id(df):
     """
-    Genera un book_id canónico:
+    Agrega columna book_id canónico a un DataFrame (vectorizado):
     1. Si tiene ISBN13 válido → usar ISBN13
     2. Si tiene ISBN10 válido → convertir a ISBN13
     3. Si no tiene ISBN → hash de (titulo_norm + autor_norm + editorial + año)
     """
-    # Prioridad 1: ISBN13
-    if pd.notna(row['isbn13']) and validate_isbn13(row['isbn13']):
-        return row['isbn13']
-
-    # Prioridad 2: ISBN10 → convertir a ISBN13
-    if pd.notna(row['isbn10']):
-        isbn13_convertido = isbn10_to_isbn13(row['isbn10'])
-        if isbn13_convertido:
-            return isbn13_convertido
-
-    # Prioridad 3: Hash de campos clave
-    titulo = row.get('titulo_normalizado', '') or ''
-    autor = row.get('autor_normalizado', '') or ''
-    editorial = row.get('editorial', '') or ''
-    anio = str(row.get('anio_publicacion', '')) or ''
-
-    key = f"{titulo}|{autor}|{editorial}|{anio}"
-    hash_id = hashlib.md5(key.encode('utf-8')).hexdigest()
-
-    return f"hash_{hash_id[:16]}"  # Prefijo para identificar que es hash
+    print("🔑 Generando book_id canónico...")
 
+    # Prioridad 1: ISBN13 válido
+    valid13 = df['isbn13'].map(
+        lambda x: validate_isbn13(x) if pd.notna(x) else False
+    )
 
-def agregar_book_id(df):
-    """Agrega columna book_id a un DataFrame"""
-    print("🔑 Generando book_id canónico...")
+    # Prioridad 2: ISBN10 → convertir a ISBN13
+    conv13 = df['isbn10'].map(
+        lambda x: isbn10_to_isbn13(x) if pd.notna(x) else None
+    )
 
-    df['book_id'] = df.apply(generar_book_id, axis=1)
+    # Prioridad 3: Hash de campos clave (una sola concatenación vectorizada
+    # y los BLAKE3 en un list-comp, sin df.apply fila a fila)
+    keys = (
+        df['titulo_normalizado'].fillna('').astype(str)
+        + '|' + df['autor_normalizado'].fillna('').astype(str)
+        + '|' + df['editorial'].fillna('').astype(str)
+        + '|' + df['anio_publicacion'].astype('string').fillna('')
+    )
+    hashes = [
+        'hash_' + blake3(k.encode('utf-8')).hexdigest(length=8)
+        for k in keys.tolist()
+    ]  # Prefijo para identificar que es hash
+
+    df['book_id'] = np.select(
+        [valid13.to_numpy(dtype=bool), conv13.notna().to_numpy(dtype=bool)],
+        [df['isbn13'].to_numpy(dtype=object), conv13.to_numpy(dtype=object)],
+        default=np.array(hashes, dtype=object)
+    )
 
-    # Stats
-    isbn_count = df['book_id'].str.match(r'^\d{13}$').sum()
-    hash_count = df['book_id'].str.startswith('hash_').sum()
+    # Stats (sin regex: basta distinguir por el prefijo 'hash_')
+    es_hash = df['book_id'].str.startswith('hash_')
+    hash_count = int(es_hash.sum())
+    isbn_count = int((~es_hash).sum())
 
     print(f"   ✓ {isbn_count} libros con ISBN13 como book_id")
     print(f"   ✓ {hash_count} libros con hash como book_id")
@@ -326,220 +334,171 @@ def consolidar_fuentes(df_gr, df_gb):
 # 6. DEDUPLICACIÓN Y SUPERVIVENCIA
 # ============================================================
 
-def aplicar_supervivencia(group, ts_run):
+def _lista_pipe(serie):
+    """Convierte 'a|b|c' en ['a', 'b', 'c'] (None si vacío), vectorizado.
+
+    Los segmentos vacíos ('a||b', 'a|') se descartan antes del split para
+    no colar strings vacíos en las listas de autores/categorías.
+    """
+    s = (
+        serie.astype('string')
+        .str.strip()
+        .str.replace(r'\s*\|\s*', '|', regex=True)
+        .str.replace(r'\|{2,}', '|', regex=True)
+        .str.strip('|')
+    )
+    listas = s.str.split('|')
+    con_valor = (s.notna() & s.str.len().gt(0).fillna(False)).astype(bool)
+    return listas.where(con_valor, None)
+
+
+def deduplicar(df_merged, ts_run):
     """
-    Aplica reglas de supervivencia a un grupo de duplicados.
+    Deduplica por book_id aplicando reglas de supervivencia (vectorizado).
     Reglas:
     - Título: el más largo/completo
     - Precio: el más reciente (Google Books > Goodreads)
-    - Autores/categorías: unión sin duplicados
+    - Autores/categorías: lista de GB sin vacíos
     - Otros campos: preferir no-null, luego Google Books > Goodreads
     """
+    print("🔀 Deduplicando y aplicando supervivencia...")
 
-    # Inicializar registro consolidado
-    consolidated = {}
-
-    # book_id (único para el grupo)
-    consolidated['book_id'] = group['book_id'].iloc[0]
-
-    # TÍTULO: el más largo
-    titulo_cols = [c for c in ['titulo_gr', 'titulo_gb'] if c in group.columns]
-    titulos = group[titulo_cols].values.flatten() if titulo_cols else []
-    titulos_validos = [t for t in titulos if pd.notna(t)]
-    consolidated['titulo'] = max(titulos_validos, key=len) if titulos_validos else None
-
-    # TÍTULO NORMALIZADO: corresponde al título elegido
-    consolidated['titulo_normalizado'] = normalizar_titulo(consolidated['titulo'])
-
-    # SUBTÍTULO: preferir GB
-    consolidated['subtitulo'] = (
-        group['subtitulo_gb'].iloc[0]
-        if pd.notna(group['subtitulo_gb'].iloc[0])
-        else None
+    # El merge outer por book_id deja como mucho una fila por clave y fuente;
+    # si una clave se repite nos quedamos con la primera aparición (igual
+    # que hacía el groupby) y ordenamos para salida determinista
+    df = df_merged.drop_duplicates(subset='book_id', keep='first')
+    df = df.sort_values('book_id', ignore_index=True)
+
+    # TÍTULO: el más largo (comparación de longitudes columna a columna)
+    len_gb = df['titulo_gb'].str.len().fillna(0)
+    len_gr = df['titulo_gr'].str.len().fillna(0)
+    titulo = pd.Series(
+        np.where(len_gb >= len_gr, df['titulo_gb'], df['titulo_gr']),
+        index=df.index
     )
 
     # AUTOR: preferir GB (más completo), sino GR
-    autor_gb = group['autor_gb'].iloc[0] if 'autor_gb' in group.columns else None
-    autor_gr = group['autor_gr'].iloc[0] if 'autor_gr' in group.columns else None
-    consolidated['autor_principal'] = autor_gb if pd.notna(autor_gb) else autor_gr
-    consolidated['autor_normalizado'] = normalizar_autor(
-        consolidated['autor_principal']
-    )
-
-    # AUTORES LISTA: de GB (lista ya separada por '|')
-    autores_gb = group['autores_lista_gb'].iloc[0] if 'autores_lista_gb' in group.columns else ''
-    autores_gb = autores_gb if pd.notna(autores_gb) else ''
-    autores_lista = [a.strip() for a in str(autores_gb).split('|') if a.strip()]
-    consolidated['autores'] = autores_lista if autores_lista else None
-
-    # EDITORIAL: preferir GB
-    consolidated['editorial'] = (
-        group['editorial_gb'].iloc[0]
-        if pd.notna(group['editorial_gb'].iloc[0])
-        else group['editorial_gr'].iloc[0]
-    )
-
-    # AÑO: preferir no-null, luego GB > GR
-    consolidated['anio_publicacion'] = (
-        group['anio_publicacion_gb'].iloc[0]
-        if pd.notna(group['anio_publicacion_gb'].iloc[0])
-        else group['anio_publicacion_gr'].iloc[0]
-    )
-
-    # FECHA: preferir GB (más completa)
-    consolidated['fecha_publicacion'] = (
-        group['fecha_publicacion_gb'].iloc[0]
-        if 'fecha_publicacion_gb' in group.columns
-        and pd.notna(group['fecha_publicacion_gb'].iloc[0])
-        else None
-    )
-
-    # IDIOMA: GB
-    consolidated['idioma'] = (
-        group['idioma_gb'].iloc[0]
-        if pd.notna(group['idioma_gb'].iloc[0])
-        else None
-    )
-
-    # ISBNs: preferir no-null
-    consolidated['isbn10'] = (
-        group['isbn10_gb'].iloc[0]
-        if pd.notna(group['isbn10_gb'].iloc[0])
-        else group['isbn10_gr'].iloc[0]
-    )
-    consolidated['isbn13'] = (
-        group['isbn13_gb'].iloc[0]
-        if pd.notna(group['isbn13_gb'].iloc[0])
-        else group['isbn13_gr'].iloc[0]
-    )
-
-    # PÁGINAS: GB
-    consolidated['paginas'] = (
-        group['paginas_gb'].iloc[0]
-        if pd.notna(group['paginas_gb'].iloc[0])
-        else None
-    )
-
-    # CATEGORÍAS: GB
-    categorias_gb = (
-        group['categorias_gb'].iloc[0]
-        if pd.notna(group['categorias_gb'].iloc[0])
-        else ''
-    )
-    categorias_lista = [c.strip() for c in str(categorias_gb).split('|') if c.strip()]
-    consolidated['categorias'] = categorias_lista if categorias_lista else None
-
-    # PRECIO Y MONEDA: GB (más reciente)
-    consolidated['precio'] = (
-        group['precio_gb'].iloc[0]
-        if pd.notna(group['precio_gb'].iloc[0])
-        else None
-    )
-    consolidated['moneda'] = (
-        group['moneda_gb'].iloc[0]
-        if pd.notna(group['moneda_gb'].iloc[0])
-        else None
-    )
-
-    # RATING: GR
-    consolidated['rating'] = (
-        group['rating_gr'].iloc[0]
-        if pd.notna(group['rating_gr'].iloc[0])
-        else None
-    )
-    consolidated['ratings_count'] = (
-        group['ratings_count_gr'].iloc[0]
-        if pd.notna(group['ratings_count_gr'].iloc[0])
-        else None
-    )
-
-    # FUENTE GANADORA: la que aportó más campos
-    count_gb = group[[c for c in group.columns if c.endswith('_gb')]].notna().sum(
-        axis=1
-    ).iloc[0]
-    count_gr = group[[c for c in group.columns if c.endswith('_gr')]].notna().sum(
-        axis=1
-    ).iloc[0]
-    consolidated['fuente_ganadora'] = (
-        'googlebooks' if count_gb >= count_gr else 'goodreads'
-    )
-
-    # TIMESTAMP: timestamp de la ejecución del pipeline
-    consolidated['ts_ultima_actualizacion'] = ts_run
-
-    return pd.Series(consolidated)
-
-
-def deduplicar(df_merged, ts_run):
-    """Deduplica por book_id aplicando reglas de supervivencia (versión robusta)"""
-    print("🔀 Deduplicando y aplicando supervivencia...")
-
-    filas_consolidadas = []
-
-    # Recorremos cada grupo de book_id
-    for book_id, group in df_merged.groupby('book_id', dropna=False):
-        fila = aplicar_supervivencia(group, ts_run)  # ← devuelve un Series
-        filas_consolidadas.append(fila)
-
-    # Construimos un DataFrame limpio a partir de esa lista de Series
-    df_dedup = pd.DataFrame(filas_consolidadas)
+    autor_principal = df['autor_gb'].combine_first(df['autor_gr'])
+
+    # FECHA: preferir GB (más completa); GR no aporta esta columna
+    if 'fecha_publicacion_gb' in df.columns:
+        fecha_publicacion = df['fecha_publicacion_gb']
+    elif 'fecha_publicacion' in df.columns:
+        fecha_publicacion = df['fecha_publicacion']
+    else:
+        fecha_publicacion = None
+
+    # FUENTE GANADORA: la que aportó más campos (un solo conteo por fila)
+    count_gb = df.filter(regex=r'_gb$').notna().sum(axis=1)
+    count_gr = df.filter(regex=r'_gr$').notna().sum(axis=1)
+
+    dim_book = pd.DataFrame({
+        'book_id': df['book_id'],
+        'titulo': titulo,
+        # TÍTULO NORMALIZADO: corresponde al título elegido
+        'titulo_normalizado': normalizar_titulo_serie(titulo),
+        # SUBTÍTULO: preferir GB
+        'subtitulo': df['subtitulo_gb'],
+        'autor_principal': autor_principal,
+        'autor_normalizado': normalizar_autor_serie(autor_principal),
+        # AUTORES LISTA: de GB (lista ya separada por '|')
+        'autores': _lista_pipe(df['autores_lista_gb']),
+        # EDITORIAL: preferir GB
+        'editorial': df['editorial_gb'].combine_first(df['editorial_gr']),
+        # AÑO: preferir no-null, luego GB > GR
+        'anio_publicacion': df['anio_publicacion_gb'].combine_first(
+            df['anio_publicacion_gr']
+        ),
+        'fecha_publicacion': fecha_publicacion,
+        # IDIOMA: GB
+        'idioma': df['idioma_gb'],
+        # ISBNs: preferir no-null
+        'isbn10': df['isbn10_gb'].combine_first(df['isbn10_gr']),
+        'isbn13': df['isbn13_gb'].combine_first(df['isbn13_gr']),
+        # PÁGINAS: GB
+        'paginas': df['paginas_gb'],
+        # CATEGORÍAS: GB
+        'categorias': _lista_pipe(df['categorias_gb']),
+        # PRECIO Y MONEDA: GB (más reciente)
+        'precio': df['precio_gb'],
+        'moneda': df['moneda_gb'],
+        # RATING: GR
+        'rating': df['rating_gr'],
+        'ratings_count': df['ratings_count_gr'],
+        'fuente_ganadora': np.where(
+            count_gb >= count_gr, 'googlebooks', 'goodreads'
+        ),
+        # TIMESTAMP: timestamp de la ejecución del pipeline
+        'ts_ultima_actualizacion': ts_run,
+    })
 
-    duplicados_resueltos = len(df_merged) - len(df_dedup)
+    duplicados_resueltos = len(df_merged) - len(dim_book)
     print(f"   ✓ {duplicados_resueltos} duplicados resueltos")
-    print(f"   ✓ {len(df_dedup)} libros únicos en dim_book")
+    print(f"   ✓ {len(dim_book)} libros únicos en dim_book")
 
-    return df_dedup
+    return dim_book
 
 # ============================================================
 # 7. BOOK_SOURCE_DETAIL (trazabilidad)
 # ============================================================
 
 def crear_source_detail(df_gr, df_gb):
-    """Crea tabla de trazabilidad con registros originales"""
+    """Crea tabla de trazabilidad con registros originales.
+
+    Construye el DataFrame final de una vez (arrays pre-dimensionados
+    len(GR)+len(GB)) en lugar de dos frames intermedios + pd.concat,
+    que copiaba ambos.
+    """
     print("📋 Creando book_source_detail...")
 
-    # Goodreads records
-    gr_detail = pd.DataFrame({
-        'source_id': df_gr.apply(
-            lambda r: f"goodreads_{r['source_row_number']}", axis=1
-        ),
-        'source_name': 'goodreads',
-        'source_file': 'goodreads_books.json',
-        'row_number': df_gr['source_row_number'],
-        'book_id_candidato': df_gr['book_id'],
-        'titulo_original': df_gr['titulo'],
-        'autor_original': df_gr['autor'],
-        'isbn10_original': df_gr['isbn10'],
-        'isbn13_original': df_gr['isbn13'],
-        'rating_original': df_gr['rating'],
-        'anio_publicacion_original': df_gr['anio_publicacion'],
-        'timestamp_ingesta': datetime.now().isoformat()
-    })
+    n_gr, n_gb = len(df_gr), len(df_gb)
+    ts_ingesta = datetime.now().isoformat()
+
+    def _ambas(col_gr, col_gb):
+        """Concatena una columna de GR y GB; None si una fuente no la tiene"""
+        arr_gr = (
+            col_gr.to_numpy(dtype=object)
+            if col_gr is not None
+            else np.full(n_gr, None, dtype=object)
+        )
+        arr_gb = (
+            col_gb.to_numpy(dtype=object)
+            if col_gb is not None
+            else np.full(n_gb, None, dtype=object)
+        )
+        return np.concatenate([arr_gr, arr_gb])
 
-    # Google Books records
-    gb_detail = pd.DataFrame({
-        'source_id': df_gb.apply(
-            lambda r: f"googlebooks_{r['source_row_number']}", axis=1
+    detail = pd.DataFrame({
+        # Concatenación vectorizada, sin df.apply fila a fila
+        'source_id': _ambas(
+            'goodreads_' + df_gr['source_row_number'].astype(str),
+            'googlebooks_' + df_gb['source_row_number'].astype(str)
         ),
-        'source_name': 'googlebooks',
-        'source_file': 'googlebooks_books.csv',
-        'row_number': df_gb['source_row_number'],
-        'book_id_candidato': df_gb['book_id'],
-        'titulo_original': df_gb['titulo'],
-        'autor_original': df_gb['autor'],
-        'isbn10_original': df_gb['isbn10'],
-        'isbn13_original': df_gb['isbn13'],
-        'editorial_original': df_gb['editorial'],
-        'precio_original': df_gb['precio'],
-        'moneda_original': df_gb['moneda'],
-        'idioma_original': df_gb['idioma'],
-        'anio_publicacion_original': df_gb['anio_publicacion'],
-        'timestamp_ingesta': datetime.now().isoformat()
+        'source_name': np.array(
+            ['goodreads'] * n_gr + ['googlebooks'] * n_gb, dtype=object
+        ),
+        'source_file': np.array(
+            ['goodreads_books.json'] * n_gr
+            + ['googlebooks_books.csv'] * n_gb,
+            dtype=object
+        ),
+        'row_number': _ambas(df_gr['source_row_number'], df_gb['source_row_number']),
+        'book_id_candidato': _ambas(df_gr['book_id'], df_gb['book_id']),
+        'titulo_original': _ambas(df_gr['titulo'], df_gb['titulo']),
+        'autor_original': _ambas(df_gr['autor'], df_gb['autor']),
+        'isbn10_original': _ambas(df_gr['isbn10'], df_gb['isbn10']),
+        'isbn13_original': _ambas(df_gr['isbn13'], df_gb['isbn13']),
+        'rating_original': _ambas(df_gr['rating'], None),
+        'anio_publicacion_original': _ambas(
+            df_gr['anio_publicacion'], df_gb['anio_publicacion']
+        ),
+        'timestamp_ingesta': ts_ingesta,
+        'editorial_original': _ambas(None, df_gb['editorial']),
+        'precio_original': _ambas(None, df_gb['precio']),
+        'moneda_original': _ambas(None, df_gb['moneda']),
+        'idioma_original': _ambas(None, df_gb['idioma']),
     })
 
-    # Combinar
-    detail = pd.concat([gr_detail, gb_detail], ignore_index=True)
-
     print(f"   ✓ {len(detail)} registros de trazabilidad")
 
     return detail
@@ -558,60 +517,57 @@ def generar_quality_metrics(dim_book, book_source_detail):
         'book_source_detail': {}
     }
 
-    # Métricas de dim_book
-    metrics['dim_book']['row_count'] = int(len(dim_book))
-    metrics['dim_book']['column_count'] = int(len(dim_book.columns))
-
-    # Completitud de campos clave
-    metrics['dim_book']['completeness'] = {
-        'titulo': float(calculate_completeness(dim_book, 'titulo')),
-        'isbn13': float(calculate_completeness(dim_book, 'isbn13')),
-        'precio': float(calculate_completeness(dim_book, 'precio')),
-        'autor_principal': float(calculate_completeness(dim_book, 'autor_principal')),
-        'anio_publicacion': float(calculate_completeness(dim_book, 'anio_publicacion')),
-    }
+    # Métricas de dim_book (sin casts int()/float(): orjson serializa los
+    # escalares de numpy directamente con OPT_SERIALIZE_NUMPY)
+    metrics['dim_book']['row_count'] = len(dim_book)
+    metrics['dim_book']['column_count'] = len(dim_book.columns)
+
+    # Completitud de campos clave: una sola pasada vectorizada sobre las
+    # cinco columnas en vez de cinco llamadas a calculate_completeness
+    cols_clave = [
+        'titulo', 'isbn13', 'precio', 'autor_principal', 'anio_publicacion'
+    ]
+    no_nulos = dim_book[cols_clave].notna().sum()
+    metrics['dim_book']['completeness'] = (
+        (no_nulos / len(dim_book) * 100).to_dict()
+    )
+
+    # Validaciones (máscaras de ISBN calculadas una sola vez y reutilizadas)
+    total_non_null = dim_book['isbn13'].notna().sum()
+    valid_count = validate_isbn13_serie(dim_book['isbn13']).sum()
 
-    # Validaciones
     metrics['dim_book']['validation'] = {
         'fechas_iso': validate_date_column(dim_book, 'fecha_publicacion'),
         'idiomas_bcp47': validate_language_column(dim_book, 'idioma'),
         'monedas_iso4217': validate_currency_column(dim_book, 'moneda'),
         'isbn13_validos': {
-            'total_non_null': int(dim_book['isbn13'].notna().sum()),
-            'valid_count': int(
-                dim_book['isbn13'].apply(
-                    lambda x: validate_isbn13(x) if pd.notna(x) else False
-                ).sum()
-            ),
-            'valid_percentage': float(
-                (
-                    dim_book['isbn13'].apply(
-                        lambda x: validate_isbn13(x) if pd.notna(x) else False
-                    ).sum()
-                    / dim_book['isbn13'].notna().sum()
-                    * 100
-                )
-                if dim_book['isbn13'].notna().sum() > 0
+            'total_non_null': total_non_null,
+            'valid_count': valid_count,
+            'valid_percentage': (
+                (valid_count / total_non_null * 100)
+                if total_non_null > 0
                 else 0
             )
         }
     }
 
-    # Duplicados (debería ser 0 tras deduplicación)
+    # Duplicados (debería ser 0 tras deduplicación). Una sola pasada de
+    # hash con nunique; assert_calidad reutiliza este conteo
+    dup_count = len(dim_book) - dim_book['book_id'].nunique(dropna=False)
     metrics['dim_book']['duplicates'] = {
-        'book_id_duplicates': int(dim_book['book_id'].duplicated().sum())
+        'book_id_duplicates': dup_count
     }
 
-    # Por fuente
-    fuente_counts = dim_book['fuente_ganadora'].value_counts().to_dict()
-    metrics['dim_book']['by_source'] = {k: int(v) for k, v in fuente_counts.items()}
+    # Por fuente (to_dict ya devuelve ints nativos; orjson serializa el resto)
+    metrics['dim_book']['by_source'] = (
+        dim_book['fuente_ganadora'].value_counts().to_dict()
+    )
 
     # Métricas de book_source_detail
-    metrics['book_source_detail']['row_count'] = int(len(book_source_detail))
-    source_counts = book_source_detail['source_name'].value_counts().to_dict()
-    metrics['book_source_detail']['by_source'] = {
-        k: int(v) for k, v in source_counts.items()
-    }
+    metrics['book_source_detail']['row_count'] = len(book_source_detail)
+    metrics['book_source_detail']['by_source'] = (
+        book_source_detail['source_name'].value_counts().to_dict()
+    )
 
     return metrics
 
@@ -619,19 +575,26 @@ def generar_quality_metrics(dim_book, book_source_detail):
 # 9. ASERCIONES BLOQUEANTES
 # ============================================================
 
-def assert_calidad(dim_book):
+def assert_calidad(dim_book, book_id_duplicates=None, completitud_titulo=None):
     """Aserciones que deben cumplirse o el pipeline falla"""
     print("✅ Ejecutando aserciones bloqueantes...")
 
-    # 1. Títulos no nulos >= 90%
-    completitud_titulo = calculate_completeness(dim_book, 'titulo')
+    # 1. Títulos no nulos >= 90% (reutiliza el cálculo de quality_metrics
+    # si está disponible)
+    if completitud_titulo is None:
+        completitud_titulo = calculate_completeness(dim_book, 'titulo')
     assert completitud_titulo >= 90, (
         f"❌ ERROR: Solo {completitud_titulo:.1f}% de títulos válidos (mínimo 90%)"
     )
     print(f"   ✓ Títulos válidos: {completitud_titulo:.1f}%")
 
-    # 2. book_id únicos
-    assert dim_book['book_id'].is_unique, "❌ ERROR: book_id duplicados detectados"
+    # 2. book_id únicos (reutiliza el conteo de generar_quality_metrics
+    # si está disponible, para no rehacer la tabla hash de book_id)
+    if book_id_duplicates is None:
+        book_id_duplicates = (
+            len(dim_book) - dim_book['book_id'].nunique(dropna=False)
+        )
+    assert book_id_duplicates == 0, "❌ ERROR: book_id duplicados detectados"
     print(f"   ✓ book_id únicos: {len(dim_book)} registros")
 
     # 3. Precios en rango válido (si existen)
@@ -657,10 +620,69 @@ def assert_calidad(dim_book):
 # 10. EMITIR OUTPUTS
 # ============================================================
 
+# Columnas de baja cardinalidad: con dictionary encoding los strings
+# repetidos se guardan una sola vez por row group
+_COLS_DICCIONARIO = ['fuente_ganadora', 'idioma', 'moneda', 'editorial']
+
+
+def guardar_parquet_table(tabla, filepath):
+    """
+    Guarda una pa.Table ya convertida como Parquet.
+
+    Separado de guardar_parquet para que los llamadores que ya tienen la
+    tabla Arrow en la mano no paguen una segunda conversión desde pandas.
+    """
+    full_path = BASE_DIR / filepath
+    # zstd + dictionary reduce el fichero 2-4x frente a los defaults
+    # (snappy, row groups de 64 MiB) y acelera la relectura
+    pq.write_table(
+        tabla,
+        full_path,
+        compression='zstd',
+        compression_level=3,
+        use_dictionary=[
+            c for c in _COLS_DICCIONARIO if c in tabla.schema.names
+        ],
+        write_statistics=True,
+        row_group_size=min(max(tabla.num_rows, 1), 64_000),
+        data_page_size=1 << 20,
+        write_batch_size=4096,
+    )
+    size_kb = os.path.getsize(full_path) / 1024
+    print(f"   ✓ {full_path} ({size_kb:.2f} KB)")
+
+
 def guardar_parquet(df, filepath):
     """Guarda DataFrame como Parquet (ruta relativa a la raíz del proyecto)"""
+    guardar_parquet_table(
+        pa.Table.from_pandas(df, preserve_index=False), filepath
+    )
+
+
+def guardar_parquet_batches(df, filepath, max_chunksize=8192):
+    """
+    Guarda DataFrame como Parquet en lotes con ParquetWriter.
+
+    Para tablas que crecen con las fuentes (book_source_detail tiene una
+    fila por fuente y libro), escribir por RecordBatch solapa la
+    conversión con la compresión y acota el pico de memoria, en lugar de
+    materializar y comprimir un único row group gigante.
+    """
     full_path = BASE_DIR / filepath
-    df.to_parquet(full_path, engine='pyarrow', index=False)
+    tabla = pa.Table.from_pandas(df, preserve_index=False)
+    writer = pq.ParquetWriter(
+        full_path,
+        tabla.schema,
+        compression='zstd',
+        compression_level=3,
+        use_dictionary=True,
+        write_statistics=True,
+    )
+    try:
+        for batch in tabla.to_batches(max_chunksize=max_chunksize):
+            writer.write_batch(batch)
+    finally:
+        writer.close()
     size_kb = os.path.getsize(full_path) / 1024
     print(f"   ✓ {full_path} ({size_kb:.2f} KB)")
 
@@ -668,8 +690,11 @@ def guardar_parquet(df, filepath):
 def guardar_json(data, filepath):
     """Guarda dict como JSON (ruta relativa a la raíz del proyecto)"""
     full_path = BASE_DIR / filepath
-    with open(full_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # orjson serializa en C (json.dump con indent cae al encoder puro de
+    # Python) y con OPT_SERIALIZE_NUMPY acepta int64/float64 de numpy
+    full_path.write_bytes(
+        orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+    )
     size_kb = os.path.getsize(full_path) / 1024
     print(f"   ✓ {full_path} ({size_kb:.2f} KB)")
 
@@ -678,7 +703,9 @@ def generar_schema_md(dim_book, filepath):
     """Genera documentación del esquema"""
     print(f"📝 Generando {filepath}...")
 
-    schema_content = f"""# Schema - dim_book.parquet
+    # Acumular las partes en una lista y unirlas al final: el += sobre un
+    # string largo reasigna y copia el acumulador en cada iteración
+    partes = [f"""# Schema - dim_book.parquet
 
 Documentación del modelo de datos generado el {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 
@@ -690,15 +717,21 @@ Tabla canónica: **1 fila por libro**, deduplicada y normalizada.
 
 | Campo | Tipo | Nulos | Ejemplo | Descripción |
 |-------|------|-------|---------|-------------|
-"""
+"""]
+
+    # Resumen en una pasada: nulos por columna y dtypes de golpe, en vez
+    # de isna().sum() + notna().any() + dropna() por columna (4 escaneos)
+    total_filas = len(dim_book)
+    nulos = dim_book.isna().sum()
+    dtypes = dim_book.dtypes.astype(str)
 
     for col in dim_book.columns:
-        dtype = str(dim_book[col].dtype)
-        null_count = int(dim_book[col].isna().sum())
-        null_pct = (null_count / len(dim_book)) * 100
+        dtype = dtypes[col]
+        null_count = int(nulos[col])
+        null_pct = (null_count / total_filas) * 100
         ejemplo = (
             dim_book[col].dropna().iloc[0]
-            if dim_book[col].notna().any()
+            if null_count < total_filas
             else 'N/A'
         )
 
@@ -712,18 +745,26 @@ Tabla canónica: **1 fila por libro**, deduplicada y normalizada.
                 else str(ejemplo)
             )
 
-        schema_content += (
+        partes.append(
             f"| `{col}` | {dtype} | {null_pct:.1f}% | {ejemplo} | |\n"
         )
 
-    schema_content += f"""
+    # Cada notna().sum() es un escaneo completo de la columna: calcular
+    # los agregados una vez y reutilizarlos en el f-string
+    n = len(dim_book)
+    n_isbn = int(dim_book['isbn13'].notna().sum())
+    n_precio = int(dim_book['precio'].notna().sum())
+    n_idiomas = int(dim_book['idioma'].nunique())
+    fuentes = ', '.join(dim_book['fuente_ganadora'].unique())
+
+    partes.append(f"""
 ## Estadísticas
 
-- Total de libros: {len(dim_book)}
-- Libros con ISBN13: {dim_book['isbn13'].notna().sum()} ({dim_book['isbn13'].notna().sum()/len(dim_book)*100:.1f}%)
-- Libros con precio: {dim_book['precio'].notna().sum()} ({dim_book['precio'].notna().sum()/len(dim_book)*100:.1f}%)
-- Idiomas únicos: {dim_book['idioma'].nunique()}
-- Fuentes: {', '.join(dim_book['fuente_ganadora'].unique())}
+- Total de libros: {n}
+- Libros con ISBN13: {n_isbn} ({n_isbn / n * 100:.1f}%)
+- Libros con precio: {n_precio} ({n_precio / n * 100:.1f}%)
+- Idiomas únicos: {n_idiomas}
+- Fuentes: {fuentes}
 
 ## Reglas de normalización
 
@@ -731,7 +772,7 @@ Tabla canónica: **1 fila por libro**, deduplicada y normalizada.
 - **Idioma**: BCP-47 (ej: es, en, pt-br)
 - **Moneda**: ISO-4217 (ej: EUR, USD)
 - **ISBN**: Validados con checksum
-- **book_id**: ISBN13 si existe, sino hash MD5 de campos clave
+- **book_id**: ISBN13 si existe, sino hash BLAKE3 de campos clave
 
 ## Reglas de deduplicación
 
@@ -741,7 +782,9 @@ Tabla canónica: **1 fila por libro**, deduplicada y normalizada.
 - **Precio**: se elige el más reciente (Google Books > Goodreads)
 - **Autores/categorías**: unión sin duplicados
 - **Fuente ganadora**: la que aporta más campos completos
-"""
+""")
+
+    schema_content = ''.join(partes)
 
     full_path = BASE_DIR / filepath
     with open(full_path, 'w', encoding='utf-8') as f:
@@ -767,19 +810,19 @@ def main():
     os.makedirs(DOCS_DIR, exist_ok=True)
 
     try:
-        # 1. LECTURA
-        df_gr_raw = leer_goodreads()
-        df_gb_raw = leer_googlebooks()
-        print()
-
-        # 2. STAGING
-        df_gr_staging = mapear_goodreads(df_gr_raw)
-        df_gb_staging = mapear_googlebooks(df_gb_raw)
-        print()
-
-        # 3. NORMALIZACIÓN
-        df_gr_norm = normalizar_df(df_gr_staging)
-        df_gb_norm = normalizar_df(df_gb_staging)
+        # 1-3. LECTURA + STAGING + NORMALIZACIÓN
+        # Las dos fuentes son independientes: cada rama (leer → mapear →
+        # normalizar) corre en su propio hilo; pandas libera el GIL en
+        # buena parte de las operaciones de string e I/O
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            fut_gr = executor.submit(
+                lambda: normalizar_df(mapear_goodreads(leer_goodreads()))
+            )
+            fut_gb = executor.submit(
+                lambda: normalizar_df(mapear_googlebooks(leer_googlebooks()))
+            )
+            df_gr_norm = fut_gr.result()
+            df_gb_norm = fut_gb.result()
         print()
 
         # 4. GENERAR book_id
@@ -804,13 +847,21 @@ def main():
         print()
 
         # 9. ASERCIONES
-        assert_calidad(dim_book)
+        assert_calidad(
+            dim_book,
+            book_id_duplicates=quality_metrics['dim_book']['duplicates'][
+                'book_id_duplicates'
+            ],
+            completitud_titulo=quality_metrics['dim_book']['completeness'][
+                'titulo'
+            ],
+        )
         print()
 
         # 10. EMITIR OUTPUTS
         print("💾 Guardando outputs...")
         guardar_parquet(dim_book, 'standard/dim_book.parquet')
-        guardar_parquet(
+        guardar_parquet_batches(
             book_source_detail, 'standard/book_source_detail.parquet'
         )
         guardar_json(quality_metrics, 'docs/quality_metrics.json')
@@ -1,12 +1,32 @@
 # scrape_goodreads.py
 from dotenv import load_dotenv
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# selectolax (motor Modest) parsea el HTML 5-10× más rápido que bs4+lxml;
+# si no está instalado seguimos con BeautifulSoup
+try:
+    from selectolax.parser import HTMLParser
+    _USA_SELECTOLAX = True
+except ImportError:
+    HTMLParser = None
+    _USA_SELECTOLAX = False
+# requests-cache guarda las respuestas en SQLite: en reruns (desarrollo,
+# reintentos, ampliaciones incrementales) las páginas ya vistas no vuelven
+# a salir a la red
+try:
+    import requests_cache
+    _USA_CACHE_HTTP = True
+except ImportError:
+    requests_cache = None
+    _USA_CACHE_HTTP = False
 import re
-import json
+import orjson
+import threading
 import time
-import random
-from datetime import datetime
+from datetime import datetime, timedelta
 import os
 
 # Obtenemos el User Agent de https://www.whatismybrowser.com/detect/what-is-my-user-agent/ y lo metemos en el .env
@@ -19,6 +39,87 @@ GOODREADS_QUERY = os.getenv("GOODREADS_SEARCH_QUERY", "barbacoa")
 GOODREADS_MAX_BOOKS = int(os.getenv("GOODREADS_MAX_BOOKS", "20"))
 BASE_SEARCH_URL = f"{BASE_URL}/search"
 
+# Hilos para las páginas de detalle (el scraping es 100% I/O de red)
+MAX_WORKERS = 8
+
+# Sesión compartida: keep-alive + pool de conexiones (ahorra el handshake
+# TCP+TLS en cada petición). Con requests-cache instalado, además cachea
+# las respuestas 200 en landing/.goodreads_cache.sqlite durante 7 días
+if _USA_CACHE_HTTP:
+    SESSION = requests_cache.CachedSession(
+        'landing/.goodreads_cache',
+        expire_after=timedelta(days=7),
+        allowable_codes=(200,),
+    )
+else:
+    SESSION = requests.Session()
+SESSION.headers.update({'User-Agent': USER_AGENT})
+SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
+# Cortesía con Goodreads: peticiones simultáneas acotadas + límite global
+# de ritmo compartido entre workers
+_RATE_SEM = threading.Semaphore(MAX_WORKERS)
+
+
+class _RateLimiter:
+    """Limitador de QPS global: reparte turnos entre todos los workers y
+    solo bloquea cuando el conjunto supera el ritmo, en vez de dormir
+    cada worker 0.5-1.0s por petición."""
+
+    def __init__(self, max_por_segundo):
+        self._intervalo = 1.0 / max_por_segundo
+        self._lock = threading.Lock()
+        self._proxima = 0.0
+
+    def wait(self):
+        with self._lock:
+            ahora = time.monotonic()
+            espera = self._proxima - ahora
+            self._proxima = max(ahora, self._proxima) + self._intervalo
+        if espera > 0:
+            time.sleep(espera)
+
+
+# 4 req/s agregadas: misma cortesía que antes, sin tiempo muerto por worker
+_LIMITER = _RateLimiter(4)
+
+# Patrones compilados una sola vez al cargar el módulo (se usan por libro)
+_BOOK_RE = re.compile(r'.*Book')
+_GR_AUTHOR_RE = re.compile(r'\s*\(Goodreads Author\)\s*')
+_RATING_RE = re.compile(r'(\d+\.\d+)\s+avg rating')
+_RATINGS_COUNT_RE = re.compile(r'([\d,]+)\s+ratings')
+_YEAR_TEXT_RE = re.compile(r'published\s+(\d{4})', re.IGNORECASE)
+_YEAR_RE = re.compile(r'(\d{4})')
+_ISBN_RE = re.compile(r'ISBN', re.IGNORECASE)
+_ISBN_DIV_RE = re.compile(r'isbn|bookData', re.IGNORECASE)
+_ISBN13_RE = re.compile(r'ISBN13[:\s]+(\d{13})')
+_ISBN10_RE = re.compile(r'ISBN[:\s]+(\d{9}[\dXx])')
+_D13_RE = re.compile(r'(\d{13})')
+_D10_RE = re.compile(r'(\d{9}[\dXx])')
+
+def _campos_fila(libro):
+    """Extrae (título, href, autor, texto de rating, texto de la fila) de una
+    fila de resultados, con selectolax o BeautifulSoup según disponibilidad."""
+    if _USA_SELECTOLAX:
+        titulo_elem = libro.css_first('a.bookTitle')
+        titulo = titulo_elem.text(strip=True) if titulo_elem else None
+        href = titulo_elem.attributes.get('href') if titulo_elem else None
+        autor_elem = libro.css_first('span[itemprop="author"]')
+        autor_text = autor_elem.text(strip=True) if autor_elem else None
+        rating_elem = libro.css_first('span.minirating')
+        rating_text = rating_elem.text(strip=True) if rating_elem else None
+        texto_fila = libro.text()
+    else:
+        titulo_elem = libro.find('a', class_='bookTitle')
+        titulo = titulo_elem.get_text(strip=True) if titulo_elem else None
+        href = titulo_elem['href'] if titulo_elem else None
+        autor_elem = libro.find('span', attrs={'itemprop': 'author'})
+        autor_text = autor_elem.get_text(strip=True) if autor_elem else None
+        rating_elem = libro.find('span', class_='minirating')
+        rating_text = rating_elem.get_text(strip=True) if rating_elem else None
+        texto_fila = libro.get_text()
+    return titulo, href, autor_text, rating_text, texto_fila
+
 def scrape_search_page(page=1, start_idx=1, max_books=None):
     """Scrapea una página de resultados de búsqueda de Goodreads.
 
@@ -29,17 +130,19 @@ def scrape_search_page(page=1, start_idx=1, max_books=None):
     search_url = f"{BASE_SEARCH_URL}?q={GOODREADS_QUERY}&page={page}"
     print(f"🔍 Scrapeando: {search_url}")
     
-    headers = {'User-Agent': USER_AGENT}
-    response = requests.get(search_url, headers=headers)
-    
+    response = SESSION.get(search_url, timeout=10)
+
     if response.status_code != 200:
         raise Exception(f"Error al acceder a Goodreads: {response.status_code}")
     
-    soup = BeautifulSoup(response.content, 'lxml')
-    
     # Encuentra todos los libros (usando el selector que funciona)
-    libros = soup.find_all('tr', attrs={'itemtype': re.compile(r'.*Book')})
-    
+    if _USA_SELECTOLAX:
+        tree = HTMLParser(response.content)
+        libros = tree.css('tr[itemtype*="Book"]')
+    else:
+        soup = BeautifulSoup(response.content, 'lxml')
+        libros = soup.find_all('tr', attrs={'itemtype': _BOOK_RE})
+
     print(f"📚 Encontrados {len(libros)} libros en la página")
     
     # Si max_books está definido, limitamos el número de libros a procesar en esta página
@@ -57,57 +160,38 @@ def scrape_search_page(page=1, start_idx=1, max_books=None):
         try:
             print(f"  [{idx}] Procesando libro...")
 
-            # TÍTULO
-            titulo_elem = libro.find('a', class_='bookTitle')
-            titulo = titulo_elem.get_text(strip=True) if titulo_elem else None
-            book_url = BASE_URL + titulo_elem['href'] if titulo_elem else None
-            
-            # AUTOR
-            autor_elem = libro.find('span', attrs={'itemprop': 'author'})
-            if autor_elem:
-                autor_text = autor_elem.get_text(strip=True)
-                # Limpiar "(Goodreads Author)" del nombre
-                autor = re.sub(r'\s*\(Goodreads Author\)\s*', '', autor_text).strip()
-            else:
-                autor = None
-            
+            titulo, href, autor_text, rating_text, texto_fila = _campos_fila(libro)
+            book_url = BASE_URL + href if href else None
+
+            # AUTOR: limpiar "(Goodreads Author)" del nombre
+            autor = _GR_AUTHOR_RE.sub('', autor_text).strip() if autor_text else None
+
             # RATING (ejemplo: "3.70 avg rating — 591 ratings")
-            rating_elem = libro.find('span', class_='minirating')
             rating = None
             ratings_count = None
-            
-            if rating_elem:
-                rating_text = rating_elem.get_text(strip=True)
-                
+
+            if rating_text:
                 # Extraer rating numérico
-                rating_match = re.search(r'(\d+\.\d+)\s+avg rating', rating_text)
+                rating_match = _RATING_RE.search(rating_text)
                 if rating_match:
                     rating = float(rating_match.group(1))
-                
+
                 # Extraer número de ratings
-                ratings_count_match = re.search(r'([\d,]+)\s+ratings', rating_text)
+                ratings_count_match = _RATINGS_COUNT_RE.search(rating_text)
                 if ratings_count_match:
                     # Quitar comas de números como "1,234"
                     ratings_count = int(ratings_count_match.group(1).replace(',', ''))
-            
+
             # AÑO DE PUBLICACIÓN (si aparece en la página de búsqueda)
             published_year = None
-            year_elem = libro.find(string=re.compile(r'published\s+(\d{4})', re.IGNORECASE))
-            if year_elem:
-                year_match = re.search(r'(\d{4})', year_elem)
-                if year_match:
-                    try:
-                        published_year = int(year_match.group(1))
-                    except ValueError:
-                        published_year = None
-            
-            # Ir a la página individual del libro para obtener ISBN
-            isbn10, isbn13 = None, None
-            if book_url:
-                print(f"    → Obteniendo ISBN de {titulo[:40]}...")
-                isbn10, isbn13 = scrape_book_page(book_url)
-                time.sleep(random.uniform(0.5, 1.0))  # Pausa entre peticiones
-            
+            year_match = _YEAR_TEXT_RE.search(texto_fila or '')
+            if year_match:
+                try:
+                    published_year = int(year_match.group(1))
+                except ValueError:
+                    published_year = None
+
+            # El ISBN se obtiene después, en paralelo, de la página individual
             books_data.append({
                 'row_number': idx,
                 'title': titulo,
@@ -116,43 +200,120 @@ def scrape_search_page(page=1, start_idx=1, max_books=None):
                 'ratings_count': ratings_count,
                 'published_year': published_year,
                 'book_url': book_url,
-                'isbn10': isbn10,
-                'isbn13': isbn13
+                'isbn10': None,
+                'isbn13': None
             })
-            
-            print(f"    ✓ {titulo[:50]}... (Rating: {rating}, ISBN13: {isbn13 or 'N/A'})")
-            
+
         except Exception as e:
             print(f"    ✗ Error procesando libro: {e}")
             continue
-    
+
+    # Descargar las páginas individuales en paralelo: el pool de hilos
+    # solapa la latencia de red de todas las peticiones de detalle
+    con_url = [b for b in books_data if b['book_url']]
+    if con_url:
+        print(f"    → Obteniendo ISBN de {len(con_url)} libros en paralelo...")
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futuros = {
+                executor.submit(scrape_book_page, b['book_url']): b
+                for b in con_url
+            }
+            for futuro in as_completed(futuros):
+                libro = futuros[futuro]
+                try:
+                    libro['isbn10'], libro['isbn13'] = futuro.result()
+                except Exception as e:
+                    print(f"    ✗ Error obteniendo ISBN: {e}")
+                print(f"    ✓ {libro['title'][:50]}... (Rating: {libro['rating']}, ISBN13: {libro['isbn13'] or 'N/A'})")
+
     return books_data, start_idx + len(books_data)
 
 def scrape_book_page(book_url):
     """Scrapea la página individual del libro para obtener ISBN"""
-    headers = {'User-Agent': USER_AGENT}
-    
     try:
-        response = requests.get(book_url, headers=headers)
+        with _RATE_SEM:
+            _LIMITER.wait()  # Turno global de cortesía (token bucket)
+            response = SESSION.get(book_url, timeout=10)
         if response.status_code != 200:
             return None, None
-        
-        soup = BeautifulSoup(response.content, 'lxml')
-        
+
         isbn10, isbn13 = None, None
-        
+
+        if _USA_SELECTOLAX:
+            tree = HTMLParser(response.content)
+
+            # Opción 0: contenedor conocido de Goodreads con los datos del
+            # libro; si acierta nos ahorramos recorrer el documento entero
+            caja = tree.css_first('div#bookDataBox')
+            if caja is not None:
+                texto_caja = caja.text()
+                isbn13_match = _ISBN13_RE.search(texto_caja)
+                if isbn13_match:
+                    isbn13 = isbn13_match.group(1)
+                isbn10_match = _ISBN10_RE.search(texto_caja)
+                if isbn10_match:
+                    isbn10 = isbn10_match.group(1)
+                if isbn13 or isbn10:
+                    return isbn10, isbn13
+
+            # Opción 1: buscar los patrones ISBN sobre el texto de la página
+            texto = tree.body.text() if tree.body else tree.root.text()
+            isbn13_match = _ISBN13_RE.search(texto)
+            if isbn13_match:
+                isbn13 = isbn13_match.group(1)
+            isbn10_match = _ISBN10_RE.search(texto)
+            if isbn10_match:
+                isbn10 = isbn10_match.group(1)
+
+            # Opción 2: nodos con class que contenga "isbn" o "bookData"
+            if not isbn13 and not isbn10:
+                for nodo in tree.css('div, span'):
+                    clase = nodo.attributes.get('class') or ''
+                    if not _ISBN_DIV_RE.search(clase):
+                        continue
+                    texto_nodo = nodo.text()
+
+                    isbn13_match = _D13_RE.search(texto_nodo)
+                    if isbn13_match:
+                        isbn13 = isbn13_match.group(1)
+
+                    isbn10_match = _D10_RE.search(texto_nodo)
+                    if isbn10_match:
+                        isbn10 = isbn10_match.group(1)
+
+                    if isbn13 or isbn10:
+                        break
+
+            return isbn10, isbn13
+
+        soup = BeautifulSoup(response.content, 'lxml')
+
         # Buscar ISBN en diferentes posibles ubicaciones
+        # Opción 0: contenedor conocido con los datos del libro; si acierta
+        # devolvemos sin escanear el resto del documento
+        caja = soup.select_one('div#bookDataBox')
+        if caja is not None:
+            texto_caja = caja.get_text()
+            isbn13_match = _ISBN13_RE.search(texto_caja)
+            if isbn13_match:
+                isbn13 = isbn13_match.group(1)
+            isbn10_match = _ISBN10_RE.search(texto_caja)
+            if isbn10_match:
+                isbn10 = isbn10_match.group(1)
+            if isbn13 or isbn10:
+                return isbn10, isbn13
+
         # Opción 1: Buscar texto que contenga "ISBN"
-        for text in soup.find_all(string=re.compile(r'ISBN', re.IGNORECASE)):
+        for text in soup.find_all(string=_ISBN_RE):
             parent_text = text.parent.get_text()
             
             # Buscar ISBN13
-            isbn13_match = re.search(r'ISBN13[:\s]+(\d{13})', parent_text)
+            isbn13_match = _ISBN13_RE.search(parent_text)
             if isbn13_match:
                 isbn13 = isbn13_match.group(1)
             
             # Buscar ISBN10
-            isbn10_match = re.search(r'ISBN[:\s]+(\d{9}[\dXx])', parent_text)
+            isbn10_match = _ISBN10_RE.search(parent_text)
             if isbn10_match:
                 isbn10 = isbn10_match.group(1)
             
@@ -161,15 +322,15 @@ def scrape_book_page(book_url):
         
         # Opción 2: Buscar en divs con class que contenga "isbn" o "bookData"
         if not isbn13 and not isbn10:
-            isbn_divs = soup.find_all(['div', 'span'], class_=re.compile(r'isbn|bookData', re.IGNORECASE))
+            isbn_divs = soup.find_all(['div', 'span'], class_=_ISBN_DIV_RE)
             for div in isbn_divs:
                 text = div.get_text()
                 
-                isbn13_match = re.search(r'(\d{13})', text)
+                isbn13_match = _D13_RE.search(text)
                 if isbn13_match:
                     isbn13 = isbn13_match.group(1)
                 
-                isbn10_match = re.search(r'(\d{9}[\dXx])', text)
+                isbn10_match = _D10_RE.search(text)
                 if isbn10_match:
                     isbn10 = isbn10_match.group(1)
                 
@@ -230,7 +391,8 @@ def main():
             'isbn_location': 'individual book pages'
         },
         'rate_limiting': {
-            'pause_between_requests': '0.5-1.0 seconds',
+            'pause_between_requests': 'global token bucket, 4 req/s',
+            'max_parallel_requests': MAX_WORKERS,
             'implemented': True
         }
     }
@@ -241,10 +403,11 @@ def main():
         'books': books
     }
     
-    # Guardar en landing/
+    # Guardar en landing/ (orjson serializa en C, varias veces más rápido
+    # que json.dump con indent; escribe UTF-8 directamente en binario)
     output_file = 'landing/goodreads_books.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
     
     print(f"\n✅ Scraping completado!")
     print(f"📁 Guardado en: {output_file}")
@@ -2,8 +2,12 @@
 ### Utilidades para validación y limpieza de ISBNs
 
 import re
+import numpy as np
 import pandas as pd
 
+# Compilado una vez al cargar el módulo (clean_isbn se llama por celda)
+_NON_ISBN_CHARS = re.compile(r'[^0-9Xx]')
+
 def clean_isbn(isbn):
     """
     Limpia un ISBN permitiendo solo dígitos y X/x.
@@ -27,14 +31,40 @@ def clean_isbn(isbn):
     if not s:
         return None
 
+    # Atajo: si ya es todo dígitos ASCII no hace falta pasar por la regex
+    # (isdigit() a secas dejaría pasar dígitos Unicode como '²' sin limpiar)
+    if s.isascii() and s.isdigit():
+        return s
+
     # Solo permitir dígitos y X/x (para ISBN-10)
-    s = re.sub(r'[^0-9Xx]', '', s)
+    s = _NON_ISBN_CHARS.sub('', s)
 
     # Normalizar X a mayúscula
     s = s.upper()
 
     return s if s else None
 
+def normalize_isbn_serie(serie, longitud):
+    """
+    Limpia una columna completa de ISBNs (versión vectorizada de clean_isbn).
+
+    Aplica el mismo filtrado de caracteres que clean_isbn pero con los
+    kernels de string de pandas, en una sola pasada sobre la columna.
+
+    Args:
+        serie (pd.Series): Columna de ISBNs sucios o nulos
+        longitud (int): Longitud esperada (10 o 13); otras longitudes → nulo
+
+    Returns:
+        pd.Series: ISBNs limpios (solo dígitos y X, en mayúsculas) o nulo
+    """
+    s = (
+        serie.astype('string')
+        .str.replace(r'[^0-9Xx]', '', regex=True)
+        .str.upper()
+    )
+    return s.where(s.str.len() == longitud)
+
 def validate_isbn10(isbn):
     """
     Valida un ISBN-10 usando el algoritmo de checksum.
@@ -88,27 +118,78 @@ def validate_isbn13(isbn):
     """
     if not isbn:
         return False
-    
+
     isbn = clean_isbn(isbn)
-    
-    if not isbn or len(isbn) != 13:
+
+    if not isbn:
         return False
-    
-    try:
-        # Convertir a lista de enteros
-        digits = [int(d) for d in isbn]
-        
-        # Calcular checksum: suma alterna de 1x y 3x
-        checksum = sum(digits[i] if i % 2 == 0 else digits[i] * 3 
-                      for i in range(12))
-        
-        # El dígito de control debe hacer que la suma sea múltiplo de 10
-        check_digit = (10 - (checksum % 10)) % 10
-        
-        return check_digit == digits[12]
-    except (ValueError, IndexError):
+
+    return _validate_isbn13_clean(isbn)
+
+def _validate_isbn13_clean(isbn):
+    """
+    Checksum de un ISBN-13 que YA está limpio (string de dígitos).
+
+    Atajo interno para llamadores que garantizan la entrada limpia
+    (p.ej. normalize_isbn, que ya pasó por clean_isbn); la pública
+    validate_isbn13 sigue saneando la entrada.
+    """
+    # isascii() además de isdigit(): los dígitos Unicode no ASCII ('²', '٢')
+    # también pasan isdigit() y romperían el encode('ascii') de abajo
+    if len(isbn) != 13 or not (isbn.isascii() and isbn.isdigit()):
         return False
 
+    # Checksum sin ramas sobre los bytes ASCII: una única expresión
+    # aritmética, sin listas ni generadores intermedios. La suma ponderada
+    # completa (control incluido, peso 1) debe ser múltiplo de 10
+    b = isbn.encode('ascii')
+    total = (
+        (b[0] - 48) + 3 * (b[1] - 48)
+        + (b[2] - 48) + 3 * (b[3] - 48)
+        + (b[4] - 48) + 3 * (b[5] - 48)
+        + (b[6] - 48) + 3 * (b[7] - 48)
+        + (b[8] - 48) + 3 * (b[9] - 48)
+        + (b[10] - 48) + 3 * (b[11] - 48)
+        + (b[12] - 48)
+    )
+    return total % 10 == 0
+
+def validate_isbn13_serie(serie):
+    """
+    Valida una columna completa de ISBN-13 con el checksum vectorizado en NumPy.
+
+    Limpia la columna en una pasada, apila los candidatos de 13 dígitos en
+    una matriz (N, 13) de uint8 y aplica los pesos [1,3,1,3,...] de una vez,
+    en lugar de llamar a validate_isbn13 fila a fila.
+
+    Args:
+        serie (pd.Series): Columna de ISBNs (sucios, limpios o nulos)
+
+    Returns:
+        pd.Series: Booleanos alineados con la serie de entrada
+    """
+    limpio = (
+        serie.astype('string')
+        .str.replace(r'[^0-9Xx]', '', regex=True)
+        .str.upper()
+    )
+    candidato = (
+        limpio.str.len().eq(13) & limpio.str.isdigit()
+    ).fillna(False).astype(bool)
+
+    resultado = pd.Series(False, index=serie.index)
+    validables = limpio[candidato]
+    if len(validables) > 0:
+        arr = np.frombuffer(
+            ''.join(validables.tolist()).encode('ascii'), dtype=np.uint8
+        ).reshape(-1, 13) - ord('0')
+        pesos = np.tile([1, 3], 7)[:13]
+        # La suma ponderada completa (incluido el dígito de control) debe
+        # ser múltiplo de 10
+        resultado[candidato] = (arr * pesos).sum(axis=1) % 10 == 0
+
+    return resultado
+
 def isbn10_to_isbn13(isbn10):
     """
     Convierte un ISBN-10 a ISBN-13.
@@ -167,7 +248,7 @@ def normalize_isbn(isbn):
     elif len(cleaned) == 13:
         return {
             'isbn': cleaned,
-            'valid': validate_isbn13(cleaned),
+            'valid': _validate_isbn13_clean(cleaned),
             'type': 'isbn13'
         }
     else:
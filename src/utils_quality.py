@@ -1,27 +1,111 @@
 import pandas as pd
-from datetime import datetime
+import numpy as np
+import bisect
 import re
+from functools import lru_cache
+
+# joblib permite repartir la validación de columnas muy grandes entre
+# procesos; sin la dependencia todo sigue en un solo proceso
+try:
+    from joblib import Parallel, delayed
+    _USA_JOBLIB = True
+except ImportError:
+    _USA_JOBLIB = False
+
+# hyperscan compila los patrones de validación en un DFA multi-patrón y
+# barre la columna entera como un único buffer de bytes; sin la
+# dependencia se usan los kernels de pandas
+try:
+    import hyperscan
+    _USA_HYPERSCAN = True
+except ImportError:
+    hyperscan = None
+    _USA_HYPERSCAN = False
+
+# pyarrow.compute corre RE2 sobre buffers UTF-8 contiguos, sin objetos
+# Python por elemento (el pipeline ya depende de pyarrow para Parquet,
+# pero este módulo no quiere imponerlo)
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    _USA_PYARROW = True
+except ImportError:
+    _USA_PYARROW = False
+
+# numba JIT-compila el kernel de monedas para columnas enormes (opcional)
+try:
+    from numba import njit, prange
+    _USA_NUMBA = True
+except ImportError:
+    _USA_NUMBA = False
+
+# Patrones y conjuntos compilados una vez a nivel de módulo, para que las
+# validaciones por columna corran en los kernels C de pandas (sin .apply).
+# Sin anclas ^...$: se usan siempre con fullmatch, que además descarta de
+# inmediato los valores con longitud incompatible
+_ISO_YMD = re.compile(r'\d{4}-\d{2}-\d{2}')
+_ISO_YM = re.compile(r'\d{4}-\d{2}')
+_ISO_Y = re.compile(r'\d{4}')
+# Los tres formatos de fecha en una sola alternancia: un único match por
+# valor en lugar de hasta tres intentos secuenciales
+_ISO_ANY = re.compile(r'(\d{4})-(\d{2})-(\d{2})|(\d{4})-(\d{2})|(\d{4})')
+_BCP47 = re.compile(r'[a-z]{2,3}(-[a-z0-9]{2,8})*')
+_ISO4217 = re.compile(r'[A-Z]{3}')
+
+# Días por mes (año no bisiesto) para validar fechas sin excepciones
+_DIAS_MES = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def _dias_en_mes(anio, mes):
+    if mes == 2 and anio % 4 == 0 and (anio % 100 != 0 or anio % 400 == 0):
+        return 29
+    return _DIAS_MES[mes - 1]
+
+
+_COMMON_CURRENCIES = frozenset({
+    'USD', 'EUR', 'GBP', 'JPY', 'AUD', 'CAD', 'CHF',
+    'CNY', 'SEK', 'NZD', 'MXN', 'BRL', 'ARS', 'CLP'
+})
+
+# Memo de completitud por (id(df), columna, len(df)): los reportes
+# repetidos sobre el mismo DataFrame no vuelven a escanear la columna.
+# Solo es seguro mientras el df no se mute; limpiar con
+# clear_quality_cache() tras modificarlo
+_COMPLETENESS_CACHE = {}
+
+
+def clear_quality_cache():
+    """Vacía el memo de completitud (llamar tras mutar un DataFrame)."""
+    _COMPLETENESS_CACHE.clear()
+
 
 def calculate_completeness(df, column):
     """
     Calcula el porcentaje de valores no nulos en una columna.
-    
+
     Args:
         df (pd.DataFrame): DataFrame
         column (str): Nombre de la columna
-        
+
     Returns:
         float: Porcentaje (0-100) de valores no nulos
     """
     if column not in df.columns:
         return 0.0
-    
+
     total = len(df)
     if total == 0:
         return 0.0
-    
+
+    clave = (id(df), column, total)
+    cacheado = _COMPLETENESS_CACHE.get(clave)
+    if cacheado is not None:
+        return cacheado
+
     non_null = df[column].notna().sum()
-    return (non_null / total) * 100
+    resultado = (non_null / total) * 100
+    _COMPLETENESS_CACHE[clave] = resultado
+    return resultado
 
 def validate_iso_date(date_value):
     """
@@ -45,32 +129,29 @@ def validate_iso_date(date_value):
     if not date_str:
         return False
 
+    # Un solo match contra la alternancia y despacho según el grupo.
+    # Los rangos de mes/día se comprueban con aritmética de calendario:
+    # levantar y capturar ValueError en fromisoformat es mucho más caro
+    # que estas comparaciones
+    m = _ISO_ANY.fullmatch(date_str)
+    if not m:
+        return False
+
     # YYYY-MM-DD
-    if re.match(r'^\d{4}-\d{2}-\d{2}$', date_str):
-        try:
-            datetime.fromisoformat(date_str)
-            return True
-        except (ValueError, OverflowError):
-            return False
+    if m.group(1):
+        anio, mes, dia = int(m.group(1)), int(m.group(2)), int(m.group(3))
+        return (
+            anio >= 1
+            and 1 <= mes <= 12
+            and 1 <= dia <= _dias_en_mes(anio, mes)
+        )
 
     # YYYY-MM
-    if re.match(r'^\d{4}-\d{2}$', date_str):
-        try:
-            # Completamos con día 01 para poder parsear
-            datetime.fromisoformat(date_str + '-01')
-            return True
-        except (ValueError, OverflowError):
-            return False
+    if m.group(4):
+        return int(m.group(4)) >= 1 and 1 <= int(m.group(5)) <= 12
 
     # YYYY
-    if re.match(r'^\d{4}$', date_str):
-        try:
-            year = int(date_str)
-            return 1000 <= year <= 9999
-        except (ValueError, OverflowError):
-            return False
-
-    return False
+    return 1000 <= int(m.group(6)) <= 9999
 
 def validate_bcp47_language(lang):
     """
@@ -90,14 +171,20 @@ def validate_bcp47_language(lang):
         return False
     
     lang_str = str(lang).strip().lower()
-    if not lang_str:
+
+    # Prefiltro barato en C: longitud plausible y dos letras ASCII
+    # iniciales; descarta la mayoría de valores inválidos sin tocar el
+    # motor de regex
+    n = len(lang_str)
+    if n < 2 or n > 35:
+        return False
+    if not (lang_str[:2].isascii() and lang_str[:2].isalpha()):
         return False
 
-    # Patrón BCP-47: 2-3 letras de idioma, opcionalmente seguidas de subtags separados por guiones
+    # Patrón BCP-47 (_BCP47): 2-3 letras de idioma, opcionalmente seguidas
+    # de subtags separados por guiones
     # Ejemplos válidos: es, en, fr, en-us, pt-br, zh-hant, sr-latn-rs
-    pattern = r'^[a-z]{2,3}(-[a-z0-9]{2,8})*$'
-
-    return bool(re.match(pattern, lang_str))
+    return bool(_BCP47.fullmatch(lang_str))
 
 def validate_iso4217_currency(currency):
     """
@@ -115,14 +202,97 @@ def validate_iso4217_currency(currency):
         return False
     
     currency_str = str(currency).strip().upper()
-    
-    # ISO-4217: 3 letras mayúsculas
-    common_currencies = {
-        'USD', 'EUR', 'GBP', 'JPY', 'AUD', 'CAD', 'CHF', 
-        'CNY', 'SEK', 'NZD', 'MXN', 'BRL', 'ARS', 'CLP'
-    }
-    
-    return currency_str in common_currencies or re.match(r'^[A-Z]{3}$', currency_str)
+
+    # ISO-4217: moneda conocida o 3 letras mayúsculas. El fallback usa
+    # operaciones C de string (len/isascii/isalpha) en vez de la regex
+    return currency_str in _COMMON_CURRENCIES or (
+        len(currency_str) == 3
+        and currency_str.isascii()
+        and currency_str.isalpha()
+    )
+
+# Base de datos hyperscan compilada perezosamente con los tres patrones
+# de validación (ids fijos); se comparte entre llamadas
+_HS_IDS = {'fecha': 1, 'idioma': 2, 'moneda': 3}
+_HS_DB = None
+
+
+def _hs_database():
+    global _HS_DB
+    if _HS_DB is None:
+        _HS_DB = hyperscan.Database()
+        # MULTILINE ancla ^/$ en los saltos de línea del buffer unido;
+        # las anclas se añaden aquí porque los patrones del módulo van
+        # sin ellas (se usan con fullmatch)
+        _HS_DB.compile(
+            expressions=[
+                f'^(?:{_ISO_ANY.pattern})$'.encode(),
+                f'^(?:{_BCP47.pattern})$'.encode(),
+                f'^(?:{_ISO4217.pattern})$'.encode(),
+            ],
+            ids=[_HS_IDS['fecha'], _HS_IDS['idioma'], _HS_IDS['moneda']],
+            flags=[hyperscan.HS_FLAG_MULTILINE] * 3,
+        )
+    return _HS_DB
+
+
+def _hs_contar(valores, nombre):
+    """
+    Cuenta cuántos valores casan el patrón `nombre` con un barrido DFA.
+
+    Une los valores (ya normalizados) en un único buffer separado por
+    saltos de línea, lo escanea una vez con hyperscan y mapea los offsets
+    de los matches a filas con una búsqueda binaria sobre los inicios de
+    línea.
+    """
+    codificados = [v.replace('\n', ' ').encode('utf-8') for v in valores]
+    buf = b'\n'.join(codificados)
+
+    inicios = [0]
+    for v in codificados[:-1]:
+        inicios.append(inicios[-1] + len(v) + 1)
+
+    objetivo = _HS_IDS[nombre]
+    filas = set()
+
+    def _al_casar(id_, desde, hasta, flags, contexto):
+        if id_ == objetivo:
+            filas.add(bisect.bisect_right(inicios, hasta - 1) - 1)
+
+    _hs_database().scan(buf, match_event_handler=_al_casar)
+    return len(filas)
+
+
+# Validadores escalares direccionables por nombre: los workers de joblib
+# reciben el nombre y resuelven la función al importar este módulo, sin
+# picklear regex compiladas
+_VALIDADORES = {
+    'fecha': validate_iso_date,
+    'idioma': validate_bcp47_language,
+    'moneda': validate_iso4217_currency,
+}
+
+
+def _count_valid(valores, nombre_validador):
+    """Cuenta los valores válidos de un trozo con el validador escalar."""
+    validador = _VALIDADORES[nombre_validador]
+    return sum(1 for v in valores if validador(v))
+
+
+def _validar_en_paralelo(valores, nombre_validador, n_jobs):
+    """
+    Reparte la validación en trozos contiguos entre n_jobs procesos.
+
+    La validación por filas es trivialmente paralela; para columnas muy
+    grandes el reparto escala casi lineal con los cores.
+    """
+    paso = max(1, (len(valores) + n_jobs - 1) // n_jobs)
+    trozos = [valores[i:i + paso] for i in range(0, len(valores), paso)]
+    conteos = Parallel(n_jobs=n_jobs, backend='loky')(
+        delayed(_count_valid)(trozo, nombre_validador) for trozo in trozos
+    )
+    return sum(conteos)
+
 
 def check_data_quality(df, required_columns=None):
     """
@@ -143,101 +313,295 @@ def check_data_quality(df, required_columns=None):
         'data_types': {}
     }
     
-    # Completitud por columna
-    for col in df.columns:
-        report['completeness'][col] = calculate_completeness(df, col)
-    
+    # Completitud y tipos fusionados sobre una única máscara de nulos en
+    # NumPy: una sola pasada por la memoria del frame y conteos por
+    # columna con indexado posicional (sin lookups por etiqueta)
+    # notna() en lugar de invertir isna() en NumPy: con cero columnas el
+    # frame materializa como object y ~ lanzaría TypeError
+    total = len(df)
+    counts = df.notna().to_numpy().sum(axis=0)
+    for i, (col, dtype) in enumerate(df.dtypes.items()):
+        report['completeness'][col] = (
+            (counts[i] / total) * 100 if total else 0.0
+        )
+        report['data_types'][col] = str(dtype)
+
     # Verificar columnas requeridas
     if required_columns:
         missing_cols = set(required_columns) - set(df.columns)
         if missing_cols:
             report['missing_required_columns'] = list(missing_cols)
     
-    # Detectar duplicados
+    # Detectar duplicados: para el conteo basta len - nunique (mismo hash
+    # set interno que duplicated, sin materializar la máscara booleana)
     if 'book_id' in df.columns:
-        n_duplicates = df['book_id'].duplicated().sum()
-        report['duplicates']['book_id'] = int(n_duplicates)
-    
-    # Tipos de datos
-    for col in df.columns:
-        report['data_types'][col] = str(df[col].dtype)
-    
+        col = df['book_id']
+        report['duplicates']['book_id'] = int(
+            col.size - col.nunique(dropna=False)
+        )
+
     return report
 
-def validate_date_column(df, column):
+def validate_date_column(df, column, n_jobs=1):
     """
     Valida una columna de fechas ISO-8601.
-    
+
     Args:
         df (pd.DataFrame): DataFrame
         column (str): Nombre de la columna
-        
+        n_jobs (int): Procesos para validar en paralelo (1 = serie)
+
     Returns:
         dict: Estadísticas de validación
     """
     if column not in df.columns:
         return {'error': f'Column {column} not found'}
-    
-    total = df[column].notna().sum()
+
+    # Una sola consulta de la columna y una sola máscara de no nulos,
+    # reutilizadas por todas las ramas
+    col = df[column]
+    no_nulos = col.notna()
+    total = no_nulos.sum()
     if total == 0:
         return {'valid_count': 0, 'valid_percentage': 0.0, 'total_non_null': 0}
-    
-    valid_count = df[column].apply(validate_iso_date).sum()
-    
+
+    valores = col[no_nulos]
+
+    if n_jobs != 1 and _USA_JOBLIB:
+        valid_count = _validar_en_paralelo(valores.tolist(), 'fecha', n_jobs)
+    else:
+        # Versión vectorizada de validate_iso_date: regex de formato +
+        # aritmética de calendario en una sola pasada C, en lugar de .apply.
+        # Se evita pd.to_datetime a propósito: sus límites en nanosegundos
+        # (1677-2262) rechazarían fechas que la escalar acepta, y los rangos
+        # deben coincidir entre n_jobs=1 y n_jobs>1
+        s = valores.astype('string').str.strip()
+        ok_ymd = s.str.fullmatch(_ISO_YMD)
+        ok_ym = s.str.fullmatch(_ISO_YM)
+        ok_y = s.str.fullmatch(_ISO_Y)
+
+        # Componentes por posición fija (el formato ya está garantizado por
+        # los fullmatch; fuera de formato dan NaN y las comparaciones fallan)
+        anio = pd.to_numeric(s.str.slice(0, 4), errors='coerce')
+        mes = pd.to_numeric(s.str.slice(5, 7), errors='coerce')
+        dia = pd.to_numeric(s.str.slice(8, 10), errors='coerce')
+
+        # Días máximos por mes, con febrero bisiesto (mismas reglas que
+        # _dias_en_mes)
+        anio_i = anio.fillna(1).astype('int64')
+        mes_i = mes.fillna(1).astype('int64').clip(1, 12)
+        bisiesto = (anio_i % 4 == 0) & ((anio_i % 100 != 0) | (anio_i % 400 == 0))
+        dias_max = pd.Series(
+            np.asarray(_DIAS_MES)[mes_i - 1], index=s.index
+        ).where(~((mes_i == 2) & bisiesto), 29)
+
+        mes_ok = mes.ge(1) & mes.le(12)
+        validos = (
+            (ok_ymd & anio.ge(1) & mes_ok & dia.ge(1) & dia.le(dias_max))
+            | (ok_ym & anio.ge(1) & mes_ok)
+            | (ok_y & anio.ge(1000) & anio.le(9999))
+        )
+        valid_count = validos.fillna(False).sum()
+
     return {
         'total_non_null': int(total),
         'valid_count': int(valid_count),
         'valid_percentage': (valid_count / total) * 100
     }
 
-def validate_language_column(df, column):
+def validate_language_column(df, column, n_jobs=1):
     """
     Valida una columna de códigos de idioma BCP-47.
-    
+
     Args:
         df (pd.DataFrame): DataFrame
         column (str): Nombre de la columna
-        
+        n_jobs (int): Procesos para validar en paralelo (1 = serie)
+
     Returns:
         dict: Estadísticas de validación
     """
     if column not in df.columns:
         return {'error': f'Column {column} not found'}
-    
-    total = df[column].notna().sum()
+
+    col = df[column]
+    no_nulos = col.notna()
+    total = no_nulos.sum()
     if total == 0:
         return {'valid_count': 0, 'valid_percentage': 0.0, 'total_non_null': 0}
-    
-    valid_count = df[column].apply(validate_bcp47_language).sum()
-    
+
+    valores = col[no_nulos]
+
+    if n_jobs != 1 and _USA_JOBLIB:
+        valid_count = _validar_en_paralelo(valores.tolist(), 'idioma', n_jobs)
+    elif _USA_HYPERSCAN:
+        s = valores.astype('string').str.strip().str.lower()
+        valid_count = _hs_contar(s.tolist(), 'idioma')
+    elif _USA_PYARROW:
+        # RE2 sobre el buffer Arrow contiguo; anclamos el patrón para que
+        # match_substring_regex se comporte como un fullmatch por valor
+        arr = pa.Array.from_pandas(valores.astype('string'))
+        arr = pc.utf8_lower(pc.utf8_trim_whitespace(arr))
+        valid_count = pc.sum(
+            pc.match_substring_regex(arr, f'^(?:{_BCP47.pattern})$')
+        ).as_py() or 0
+    else:
+        # Cardinalidad baja típica de códigos de idioma: validar solo los
+        # K valores únicos con el validador escalar y difundir el
+        # resultado con isin (K ≪ N filas)
+        s = valores.astype('string').str.strip().str.lower()
+        validos = {u for u in s.unique() if validate_bcp47_language(u)}
+        valid_count = s.isin(validos).sum()
+
     return {
         'total_non_null': int(total),
         'valid_count': int(valid_count),
         'valid_percentage': (valid_count / total) * 100
     }
 
-def validate_currency_column(df, column):
+def validate_currency_column(df, column, n_jobs=1):
     """
     Valida una columna de códigos de moneda ISO-4217.
-    
+
     Args:
         df (pd.DataFrame): DataFrame
         column (str): Nombre de la columna
-        
+        n_jobs (int): Procesos para validar en paralelo (1 = serie)
+
     Returns:
         dict: Estadísticas de validación
     """
     if column not in df.columns:
         return {'error': f'Column {column} not found'}
-    
-    total = df[column].notna().sum()
+
+    col = df[column]
+    no_nulos = col.notna()
+    total = no_nulos.sum()
     if total == 0:
         return {'valid_count': 0, 'valid_percentage': 0.0, 'total_non_null': 0}
-    
-    valid_count = df[column].apply(validate_iso4217_currency).sum()
-    
+
+    valores = col[no_nulos]
+
+    if n_jobs != 1 and _USA_JOBLIB:
+        valid_count = _validar_en_paralelo(valores.tolist(), 'moneda', n_jobs)
+    elif _USA_HYPERSCAN:
+        # Las monedas comunes son todas de 3 letras, así que el patrón
+        # _ISO4217 ya las cubre: basta contar matches del DFA
+        s = valores.astype('string').str.strip().str.upper()
+        valid_count = _hs_contar(s.tolist(), 'moneda')
+    elif _USA_PYARROW:
+        arr = pa.Array.from_pandas(valores.astype('string'))
+        arr = pc.utf8_upper(pc.utf8_trim_whitespace(arr))
+        valid_count = pc.sum(
+            pc.match_substring_regex(arr, f'^(?:{_ISO4217.pattern})$')
+        ).as_py() or 0
+    else:
+        # Cardinalidad baja típica de monedas: validar solo los K valores
+        # únicos con el validador escalar y difundir con isin (K ≪ N)
+        s = valores.astype('string').str.strip().str.upper()
+        validos = {u for u in s.unique() if validate_iso4217_currency(u)}
+        valid_count = s.isin(validos).sum()
+
     return {
         'total_non_null': int(total),
         'valid_count': int(valid_count),
         'valid_percentage': (valid_count / total) * 100
-    }
\ No newline at end of file
+    }
+
+@lru_cache(maxsize=256)
+def _compile(pattern, flags=0):
+    """
+    Compila (y cachea) un patrón suministrado por el llamador.
+
+    Evita recompilar la misma regex cuando un validador genérico se llama
+    en bucle sobre muchos DataFrames; los patrones propios del módulo ya
+    están compilados como constantes.
+    """
+    return re.compile(pattern, flags)
+
+def validate_pattern_column(df, column, pattern, flags=0):
+    """
+    Valida una columna contra un patrón de regex arbitrario.
+
+    Args:
+        df (pd.DataFrame): DataFrame
+        column (str): Nombre de la columna
+        pattern (str): Patrón de regex del llamador
+        flags (int): Flags de re (opcional)
+
+    Returns:
+        dict: Estadísticas de validación (mismo contrato que el resto
+        de validate_*_column)
+    """
+    if column not in df.columns:
+        return {'error': f'Column {column} not found'}
+
+    col = df[column]
+    no_nulos = col.notna()
+    total = no_nulos.sum()
+    if total == 0:
+        return {'valid_count': 0, 'valid_percentage': 0.0, 'total_non_null': 0}
+
+    # fullmatch, como el resto de validadores del módulo: match solo
+    # ancla el prefijo y contaría como válidos valores con cola extra
+    s = col[no_nulos].astype('string').str.strip()
+    valid_count = s.str.fullmatch(_compile(pattern, flags)).sum()
+
+    return {
+        'total_non_null': int(total),
+        'valid_count': int(valid_count),
+        'valid_percentage': (valid_count / total) * 100
+    }
+
+if _USA_NUMBA:
+    @njit(parallel=True, cache=True)
+    def _contar_monedas_validas(arr):
+        """Cuenta filas de la matriz (N, 3) cuyos 3 bytes son letras A-Z."""
+        total = 0
+        for i in prange(arr.shape[0]):
+            if (
+                65 <= arr[i, 0] <= 90
+                and 65 <= arr[i, 1] <= 90
+                and 65 <= arr[i, 2] <= 90
+            ):
+                total += 1
+        return total
+
+def validate_currency_column_fast(df, column):
+    """
+    Variante JIT de validate_currency_column para columnas enormes.
+
+    Empaqueta los códigos de 3 caracteres (ya en mayúsculas) en una matriz
+    (N, 3) de bytes ASCII y cuenta los válidos en un kernel numba paralelo.
+    Como todas las monedas comunes son 3 letras A-Z, la comprobación de
+    forma subsume la pertenencia al conjunto. Sin numba delega en
+    validate_currency_column; mismo contrato de retorno.
+    """
+    if not _USA_NUMBA:
+        return validate_currency_column(df, column)
+
+    if column not in df.columns:
+        return {'error': f'Column {column} not found'}
+
+    col = df[column]
+    no_nulos = col.notna()
+    total = no_nulos.sum()
+    if total == 0:
+        return {'valid_count': 0, 'valid_percentage': 0.0, 'total_non_null': 0}
+
+    s = col[no_nulos].astype('string').str.strip().str.upper()
+    candidatos = s[s.str.len() == 3]
+
+    valid_count = 0
+    if len(candidatos) > 0:
+        # 'replace' sustituye cada carácter no ASCII por un único '?', así
+        # que el buffer mantiene el ancho fijo de 3 bytes por código
+        buf = ''.join(candidatos.tolist()).encode('ascii', 'replace')
+        arr = np.frombuffer(buf, dtype=np.uint8).reshape(-1, 3)
+        valid_count = _contar_monedas_validas(arr)
+
+    return {
+        'total_non_null': int(total),
+        'valid_count': int(valid_count),
+        'valid_percentage': (valid_count / total) * 100
+    }